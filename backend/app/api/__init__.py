@@ -1,5 +1,6 @@
 from .auth import router as auth_router
 from .tests import router as tests_router
+from .adaptive import router as adaptive_router
 from .roadmap import router as roadmap_router
 from .mentoring import router as mentoring_router
 from .topics import router as topics_router
@@ -9,6 +10,7 @@ from .problems import router as problems_router
 __all__ = [
     "auth_router",
     "tests_router",
+    "adaptive_router",
     "roadmap_router",
     "mentoring_router",
     "topics_router",
@@ -0,0 +1,262 @@
+from fastapi import APIRouter, Depends, HTTPException
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
+from bson import ObjectId
+import asyncio
+
+from app.models import AdaptiveStart, AdaptiveStep, AnswerSubmit, QuestionInTest, TestResult
+from app.db import get_adaptive_sessions_collection
+from app.api.auth import get_current_user
+from app.services.question_pool import question_pool
+from app.services.irt import ItemBank, theta_to_level
+from app.services.ml_service import get_ml_service
+from app.services.session_writer import session_writer
+
+router = APIRouter(prefix="/api/tests/adaptive", tags=["adaptive"])
+ml_service = get_ml_service()
+
+# Stop once the ability estimate is this precise
+TARGET_STANDARD_ERROR = 0.3
+
+# subject -> (pool version, item bank, payloads in bank order)
+_item_banks: Dict[Optional[str], Tuple[float, ItemBank, List[QuestionInTest]]] = {}
+# One rebuild per pool reload, not one per concurrent request
+_item_banks_lock = asyncio.Lock()
+
+
+async def get_item_bank(subject: Optional[str]) -> Tuple[ItemBank, List[QuestionInTest]]:
+    """Question pool-оос IRT item bank үүсгэх (pool шинэчлэгдэх бүрт дахин)"""
+    if not question_pool.is_warm:
+        await question_pool.refresh()
+
+    version = question_pool.loaded_at
+    cached = _item_banks.get(subject)
+    if cached and cached[0] == version:
+        return cached[1], cached[2]
+
+    async with _item_banks_lock:
+        # Another request may have rebuilt it while this one waited
+        version = question_pool.loaded_at
+        cached = _item_banks.get(subject)
+        if cached and cached[0] == version:
+            return cached[1], cached[2]
+
+        questions = question_pool.questions(subject=subject)
+        bank = await asyncio.to_thread(
+            ItemBank.from_questions,
+            [q.id for q in questions],
+            [q.difficulty for q in questions],
+            [question_pool.irt_params(q.id) for q in questions],
+        )
+        _item_banks[subject] = (version, bank, questions)
+        return bank, questions
+
+
+async def _get_session(session_id: str, current_user: dict) -> dict:
+    if not ObjectId.is_valid(session_id):
+        raise HTTPException(status_code=400, detail="Invalid session id")
+    session = await get_adaptive_sessions_collection().find_one({
+        "_id": ObjectId(session_id),
+        "user_id": current_user["_id"],
+    })
+    if not session:
+        raise HTTPException(status_code=404, detail="Adaptive session not found")
+    return session
+
+
+def _ability(bank: ItemBank, responses: List[dict]) -> Tuple[float, float]:
+    items = []
+    correct = []
+    for r in responses:
+        ordinal = bank.index.get(r["question_id"])
+        if ordinal is not None:
+            items.append(ordinal)
+            correct.append(r["is_correct"])
+    return bank.estimate_ability(items, correct)
+
+
+def _is_done(session: dict, standard_error: float) -> bool:
+    return (
+        len(session["responses"]) >= session["max_questions"]
+        or standard_error <= TARGET_STANDARD_ERROR
+    )
+
+
+def _select(
+    bank: ItemBank,
+    questions: List[QuestionInTest],
+    session: dict,
+    ability: float,
+) -> Optional[QuestionInTest]:
+    asked = [bank.index[r["question_id"]] for r in session["responses"] if r["question_id"] in bank.index]
+    ordinal = bank.select_next(ability, asked)
+    return questions[ordinal] if ordinal is not None else None
+
+
+def _pending_doc(question: Optional[QuestionInTest]) -> Optional[dict]:
+    if question is None:
+        return None
+    return {
+        "question": question.model_dump(),
+        "question_id": question.id,
+        "correct_answer": question.correct_answer,
+        "topic": question.topic,
+        "difficulty": question.difficulty,
+    }
+
+
+def _step(session: dict, ability: float, standard_error: float) -> AdaptiveStep:
+    pending = session.get("pending")
+    return AdaptiveStep(
+        session_id=str(session["_id"]),
+        question=QuestionInTest(**pending["question"]) if pending else None,
+        answered=len(session["responses"]),
+        ability=ability,
+        standard_error=standard_error,
+        finished=pending is None,
+    )
+
+
+@router.post("/start", response_model=AdaptiveStep)
+async def start_adaptive_test(
+    params: AdaptiveStart,
+    current_user: dict = Depends(get_current_user)
+):
+    """Adaptive тест эхлүүлэх"""
+    sessions_col = get_adaptive_sessions_collection()
+    bank, questions = await get_item_bank(params.subject)
+    if len(bank) == 0:
+        raise HTTPException(status_code=404, detail="No questions available")
+
+    session = {
+        "user_id": current_user["_id"],
+        "subject": params.subject,
+        "max_questions": params.max_questions,
+        "status": "active",
+        "responses": [],
+        "started_at": datetime.utcnow()
+    }
+    ability, standard_error = bank.estimate_ability([], [])
+    session["pending"] = _pending_doc(_select(bank, questions, session, ability))
+    session["ability"] = ability
+    session["standard_error"] = standard_error
+
+    result = await sessions_col.insert_one(session)
+    session["_id"] = result.inserted_id
+    return _step(session, ability, standard_error)
+
+
+@router.get("/{session_id}/next", response_model=AdaptiveStep)
+async def get_next_question(
+    session_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """Одоогийн (хариулаагүй) асуултыг авах"""
+    session = await _get_session(session_id, current_user)
+    return _step(session, session["ability"], session["standard_error"])
+
+
+@router.post("/{session_id}/answer", response_model=AdaptiveStep)
+async def answer_adaptive_question(
+    session_id: str,
+    answer: AnswerSubmit,
+    current_user: dict = Depends(get_current_user)
+):
+    """Хариулт илгээж, дараагийн асуултыг авах"""
+    sessions_col = get_adaptive_sessions_collection()
+    session = await _get_session(session_id, current_user)
+    pending = session.get("pending")
+    if session["status"] != "active" or not pending:
+        raise HTTPException(status_code=400, detail="Adaptive session is finished")
+    if pending["question_id"] != answer.question_id:
+        raise HTTPException(status_code=400, detail="Answer does not match the current question")
+
+    response = {
+        "question_id": answer.question_id,
+        "answer": answer.answer,
+        "is_correct": pending["correct_answer"] == answer.answer,
+        "time_spent": answer.time_spent,
+        "topic": pending["topic"],
+        "difficulty": pending["difficulty"]
+    }
+    session["responses"].append(response)
+
+    bank, questions = await get_item_bank(session["subject"])
+    ability, standard_error = _ability(bank, session["responses"])
+    next_question = None
+    if not _is_done(session, standard_error):
+        next_question = _select(bank, questions, session, ability)
+    session["pending"] = _pending_doc(next_question)
+    session["ability"] = ability
+    session["standard_error"] = standard_error
+
+    # Guard against the same question being answered twice concurrently
+    result = await sessions_col.update_one(
+        {"_id": session["_id"], "pending.question_id": answer.question_id},
+        {
+            "$push": {"responses": response},
+            "$set": {
+                "pending": session["pending"],
+                "ability": ability,
+                "standard_error": standard_error
+            }
+        }
+    )
+    if result.modified_count == 0:
+        raise HTTPException(status_code=409, detail="Question was already answered")
+
+    return _step(session, ability, standard_error)
+
+
+@router.post("/{session_id}/finish", response_model=TestResult)
+async def finish_adaptive_test(
+    session_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """Adaptive тестийг дуусгаж, үр дүнг хадгалах"""
+    adaptive_col = get_adaptive_sessions_collection()
+    session = await _get_session(session_id, current_user)
+    if session["status"] != "active":
+        raise HTTPException(status_code=400, detail="Adaptive session is finished")
+
+    responses = session["responses"]
+    total = len(responses)
+    correct_count = sum(1 for r in responses if r["is_correct"])
+    topics_wrong = [r["topic"] for r in responses if not r["is_correct"]]
+    score = (correct_count / total * 100) if total > 0 else 0
+
+    predicted_level = theta_to_level(session["ability"])
+    _, weak_topics, model_version = await ml_service.assess(responses, topics_wrong, predict_level=False)
+
+    test_session = {
+        "user_id": current_user["_id"],
+        "questions": responses,
+        "score": score,
+        "predicted_level": predicted_level,
+        "weak_topics": weak_topics,
+        "total_questions": total,
+        "correct_count": correct_count,
+        "adaptive_session_id": session["_id"],
+        "ability": session["ability"],
+        "ml_model_version": model_version,
+        "completed_at": datetime.utcnow()
+    }
+    # Claim the session first so a double finish cannot save two results
+    claimed = await adaptive_col.update_one(
+        {"_id": session["_id"], "status": "active"},
+        {"$set": {"status": "finished", "pending": None, "finished_at": test_session["completed_at"]}}
+    )
+    if claimed.modified_count == 0:
+        raise HTTPException(status_code=409, detail="Adaptive session is finished")
+
+    test_session_id = await session_writer.write(test_session)
+
+    return TestResult(
+        id=str(test_session_id),
+        score=score,
+        total_questions=total,
+        correct_count=correct_count,
+        predicted_level=predicted_level,
+        weak_topics=weak_topics,
+        completed_at=test_session["completed_at"]
+    )
@@ -1,15 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query
+from typing import List, Optional, Literal
+from pathlib import Path
+import asyncio
+import io
+import numpy as np
 from app.db import get_users_collection, get_topics_collection, get_questions_collection, get_topic_views_collection, get_test_sessions_collection, get_roadmaps_collection
-from app.api.auth import get_current_user
+from app.api.auth import get_token_claims
 from app.models import UserResponse, UserUpdate
+from app.services.question_import import import_questions, detect_format
+from app.services.question_pool import question_pool
+from app.services.ml_service import get_ml_service
+from app.services.model_registry import ModelValidationError
+from app.services.feature_store import FeatureStore
+from app.services.user_cache import user_cache
+from app.services.password_hasher import password_hasher
+from app.services.token_revocation import revocation_list
+from app.services.login_limiter import login_limiter
+from app.config import get_settings
 from bson import ObjectId
 from datetime import datetime, timedelta
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
 
-# Dependency to check if user is admin
-async def get_current_admin(current_user: dict = Depends(get_current_user)):
+# Dependency to check if user is admin (token claims only, no DB read)
+async def get_current_admin(current_user: dict = Depends(get_token_claims)):
     if current_user.get("role") != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -71,6 +85,12 @@ async def update_user(user_id: str, updates: UserUpdate, current_user: dict = De
             {"_id": ObjectId(user_id)},
             {"$set": update_data}
         )
+        user_cache.invalidate(user_id)
+        # Tokens issued before this carry the old role/active claims
+        if "role" in update_data or "is_active" in update_data:
+            await revocation_list.revoke_user_access(
+                user_id, get_settings().access_token_expire_minutes * 60
+            )
         user = await users_collection.find_one({"_id": ObjectId(user_id)})
     
     # Return formatted
@@ -85,6 +105,64 @@ async def update_user(user_id: str, updates: UserUpdate, current_user: dict = De
     return user_data
 
 
+@router.post("/questions/import")
+async def import_question_bank(
+    file: UploadFile = File(...),
+    format: Optional[Literal["ndjson", "csv"]] = Query(default=None),
+    current_user: dict = Depends(get_current_admin)
+):
+    """Асуултын санг NDJSON/CSV файлаас бөөнөөр оруулах"""
+    fmt = format or detect_format(file.filename)
+    # UploadFile spools to disk, so the file is streamed rather than held in memory
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        report = await import_questions(stream, fmt)
+    finally:
+        stream.detach()
+    
+    if report["inserted"] or report["updated"]:
+        question_pool.invalidate()
+    return report
+
+
+@router.get("/models")
+async def get_model_version(current_user: dict = Depends(get_current_admin)):
+    """Идэвхтэй ML моделийн хувилбар"""
+    ml_service = get_ml_service()
+    models = ml_service.current
+    return {
+        "version": models.version,
+        "path": str(models.path),
+        "metadata": models.metadata,
+        "prediction_cache": ml_service.prediction_cache.stats(),
+    }
+
+
+@router.get("/auth/stats")
+async def get_auth_stats(current_user: dict = Depends(get_current_admin)):
+    """Нэвтрэлтийн cache, bcrypt queue, login limiter-ийн үзүүлэлт (энэ worker)"""
+    return {
+        "user_cache": user_cache.stats(),
+        "password_hasher": password_hasher.stats(),
+        "login_limiter": login_limiter.stats(),
+    }
+
+
+@router.post("/models/reload")
+async def reload_models(
+    force: bool = False,
+    current_user: dict = Depends(get_current_admin)
+):
+    """ML моделийг restart-гүйгээр шинэчлэх (энэ worker; бусад нь watcher-аар)"""
+    try:
+        return await get_ml_service().reload_async(force=force)
+    except ModelValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Model set rejected: {e}"
+        )
+
+
 @router.get("/analytics/topic-views")
 async def get_topic_views_analytics(current_user: dict = Depends(get_current_admin)):
     """Хичээлүүдийн үзэлтийн статистик"""
@@ -125,9 +203,36 @@ async def get_topic_views_analytics(current_user: dict = Depends(get_current_adm
     return results
 
 
+def _daily_views_from_store(start_date: datetime) -> List[dict]:
+    # Reads the memory-mapped topic_views partitions; as fresh as the last export
+    store = FeatureStore(Path(get_settings().feature_store_path))
+    results = []
+    for day in store.partitions("topic_views", start=start_date.strftime("%Y-%m-%d")):
+        # Part by part over the memory maps; only the distinct ids are kept
+        views = 0
+        users = set()
+        for part in store.iter_parts("topic_views", ["user_id"], start=day, end=day):
+            views += len(part["user_id"])
+            users.update(np.unique(part["user_id"]).tolist())
+        results.append({
+            "date": day,
+            "views": views,
+            "unique_users": len(users)
+        })
+    return results
+
+
 @router.get("/analytics/daily-views")
-async def get_daily_views(days: int = 30, current_user: dict = Depends(get_current_admin)):
-    """Сүүлийн X өдрийн өдөр тутмын үзэлт"""
+async def get_daily_views(
+    days: int = 30,
+    source: Literal["live", "store"] = "live",
+    current_user: dict = Depends(get_current_admin)
+):
+    """Сүүлийн X өдрийн өдөр тутмын үзэлт (source=store бол feature store-оос)"""
+    if source == "store":
+        start_date = datetime.utcnow() - timedelta(days=days)
+        return await asyncio.get_running_loop().run_in_executor(None, _daily_views_from_store, start_date)
+    
     views_collection = get_topic_views_collection()
     start_date = datetime.utcnow() - timedelta(days=days)
     
@@ -1,77 +1,136 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import JWTError, jwt
-import bcrypt
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from datetime import datetime, timedelta
 from typing import Optional
+from uuid import uuid4
+import math
+import time
 
 from app.config import get_settings
-from app.models import UserCreate, UserResponse, Token, TokenData, SocialLogin
+from app.models import UserCreate, UserResponse, Token, RefreshRequest, TokenData, SocialLogin
 from app.db import get_users_collection
+from app.services.user_cache import user_cache
+from app.services.password_hasher import password_hasher
+from app.services.token_revocation import revocation_list
+from app.services.login_limiter import login_limiter
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 settings = get_settings()
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
-
-def _normalize_password(password: str) -> bytes:
-    # bcrypt has a 72-byte limit; truncate to preserve legacy behavior.
-    password_bytes = password.encode("utf-8")
-    return password_bytes[:72] if len(password_bytes) > 72 else password_bytes
-
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    if not hashed_password:
-        return False
-    try:
-        hashed_bytes = (
-            hashed_password.encode("utf-8")
-            if isinstance(hashed_password, str)
-            else hashed_password
-        )
-        return bcrypt.checkpw(
-            _normalize_password(plain_password),
-            hashed_bytes,
-        )
-    except ValueError:
-        return False
-
-
-def get_password_hash(password: str) -> str:
-    hashed = bcrypt.hashpw(_normalize_password(password), bcrypt.gensalt())
-    return hashed.decode("utf-8")
-
+oauth2_scheme_optional = OAuth2PasswordBearer(tokenUrl="/api/auth/login", auto_error=False)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=15))
-    to_encode.update({"exp": expire})
+    # Float iat so a revocation in the same second still orders correctly
+    to_encode.update({"exp": expire, "iat": time.time(), "jti": uuid4().hex})
+    to_encode.setdefault("type", "access")
     return jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
-    credentials_exception = HTTPException(
+def create_refresh_token(user_id: str) -> str:
+    return create_access_token(
+        data={"sub": user_id, "type": "refresh"},
+        expires_delta=timedelta(days=settings.refresh_token_expire_days),
+    )
+
+
+def issue_tokens(user: dict) -> Token:
+    """Role ба active claim-тай access token, мөн refresh token үүсгэх"""
+    access_token = create_access_token(
+        data={
+            "sub": str(user["_id"]),
+            "role": user.get("role", "student"),
+            "active": user.get("is_active", True),
+        },
+        expires_delta=timedelta(minutes=settings.access_token_expire_minutes),
+    )
+    return Token(access_token=access_token, refresh_token=create_refresh_token(str(user["_id"])))
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def decode_token(token: str, token_type: str = "access") -> dict:
+    """JWT-г шалгаж payload буцаах (төрөл, хугацаа, хүчингүй эсэх)"""
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
     except JWTError:
-        raise credentials_exception
+        raise _credentials_exception()
+    # Tokens issued before refresh tokens existed carry no type
+    if payload.get("sub") is None or payload.get("type", "access") != token_type:
+        raise _credentials_exception()
+    if revocation_list.is_revoked(payload):
+        raise _credentials_exception()
+    return payload
+
+
+async def _load_user(user_id: str) -> dict:
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user
 
     users = get_users_collection()
     from bson import ObjectId
     user = await users.find_one({"_id": ObjectId(user_id)})
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
     user["_id"] = str(user["_id"])
+    user_cache.put(user_id, user)
     return user
 
 
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
+    payload = decode_token(token)
+    user = await _load_user(payload["sub"])
+    if not user.get("is_active", True):
+        raise _credentials_exception()
+    return user
+
+
+async def get_token_claims(token: str = Depends(oauth2_scheme)) -> dict:
+    """
+    Access token-ий claim-аас хэрэглэгчийн id, role-ийг авах
+
+    Only an "admin" role claim is trusted without a database read; admin
+    role and active changes go through admin update_user, which revokes the
+    user's older access tokens. Any other role (or a token without a role
+    claim) is resolved through get_current_user, because become-mentor
+    changes the role without revoking tokens.
+
+    Propagation window: update_user and /refresh revoke immediately on the
+    worker that handled them, but other workers only learn of it on their
+    next revocation sync, so a demoted or deactivated admin keeps admin
+    access there for up to token_revocation_refresh_seconds (default 30 s).
+    """
+    payload = decode_token(token)
+    if not payload.get("active", True):
+        raise _credentials_exception()
+    if payload.get("role") == "admin":
+        return {"_id": payload["sub"], "role": "admin", "is_active": True}
+    user = await get_current_user(token)
+    return {"_id": user["_id"], "role": user.get("role", "student"), "is_active": True}
+
+
+async def get_current_user_optional(token: Optional[str] = Depends(oauth2_scheme_optional)) -> Optional[dict]:
+    """Token байвал хэрэглэгчийг, байхгүй эсвэл буруу бол None буцаах"""
+    if not token:
+        return None
+    try:
+        return await get_current_user(token)
+    except HTTPException:
+        return None
+
+
 @router.post("/register", response_model=UserResponse)
 async def register(user_data: UserCreate):
     users = get_users_collection()
@@ -86,11 +145,17 @@ async def register(user_data: UserCreate):
     
     # Create user
     user_dict = user_data.model_dump()
-    user_dict["hashed_password"] = get_password_hash(user_dict.pop("password"))
+    user_dict["hashed_password"] = await password_hasher.hash(user_dict.pop("password"))
     user_dict["profile"] = {}
     user_dict["created_at"] = datetime.utcnow()
     
-    result = await users.insert_one(user_dict)
+    try:
+        result = await users.insert_one(user_dict)
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
     user_dict["id"] = str(result.inserted_id)
     
     return UserResponse(
@@ -103,24 +168,75 @@ async def register(user_data: UserCreate):
     )
 
 
+def client_ip(request: Request) -> Optional[str]:
+    if settings.trust_forwarded_for:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else None
+
+
 @router.post("/login", response_model=Token)
-async def login(form_data: OAuth2PasswordRequestForm = Depends()):
+async def login(request: Request, form_data: OAuth2PasswordRequestForm = Depends()):
+    # Throttle before the lookup and bcrypt, so rejected attempts cost no CPU
+    retry_after = await login_limiter.check(form_data.username, client_ip(request))
+    if retry_after > 0:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts, try again later",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+    
     users = get_users_collection()
     user = await users.find_one({"email": form_data.username})
     
-    if not user or not verify_password(form_data.password, user["hashed_password"]):
+    if not user or not await password_hasher.verify(form_data.password, user["hashed_password"]):
+        await login_limiter.failed(form_data.username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    access_token = create_access_token(
-        data={"sub": str(user["_id"])},
-        expires_delta=timedelta(minutes=settings.access_token_expire_minutes)
-    )
+    if not user.get("is_active", True):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Account is disabled",
+        )
     
-    return Token(access_token=access_token)
+    return issue_tokens(user)
+
+
+@router.post("/refresh", response_model=Token)
+async def refresh_tokens(request: RefreshRequest):
+    """Refresh token-оор шинэ token хос авах (хуучин refresh token хүчингүй болно)"""
+    payload = decode_token(request.refresh_token, token_type="refresh")
+    
+    # Role and active flag come from the database, not the old token
+    from bson import ObjectId
+    user = await get_users_collection().find_one({"_id": ObjectId(payload["sub"])})
+    if user is None or not user.get("is_active", True):
+        raise _credentials_exception()
+    
+    # Single use: of two concurrent refreshes only the first revokes it
+    if not await revocation_list.revoke_token(payload["jti"], payload["sub"], payload["exp"]):
+        raise _credentials_exception()
+    return issue_tokens(user)
+
+
+@router.post("/logout")
+async def logout(request: RefreshRequest, token: str = Depends(oauth2_scheme)):
+    """Access ба refresh token-ийг хүчингүй болгох"""
+    access = decode_token(token)
+    if access.get("jti"):
+        await revocation_list.revoke_token(access["jti"], access["sub"], access["exp"])
+    try:
+        refresh = decode_token(request.refresh_token, token_type="refresh")
+    except HTTPException:
+        refresh = None
+    if refresh is not None and refresh["sub"] == access["sub"]:
+        await revocation_list.revoke_token(refresh["jti"], refresh["sub"], refresh["exp"])
+    return {"message": "Logged out"}
 
 
 @router.get("/me", response_model=UserResponse)
@@ -137,34 +253,52 @@ async def get_me(current_user: dict = Depends(get_current_user)):
 @router.post("/social-login")
 async def social_login_api(login_data: SocialLogin):
     users_collection = get_users_collection()
-    user = await users_collection.find_one({"email": login_data.email})
     
-    if not user:
-        new_user = {
+    # One round trip: create the user on first login, otherwise a no-op read
+    update = {
+        "$setOnInsert": {
             "email": login_data.email,
             "name": login_data.name,
+            "image": login_data.image,
             "role": "student",
             "hashed_password": "",
             "profile": {},
             "created_at": datetime.utcnow(),
             "provider": login_data.provider,
-            "image": login_data.image
         }
-        result = await users_collection.insert_one(new_user)
-        user = await users_collection.find_one({"_id": result.inserted_id})
-    else:
-        if login_data.image and user.get("image") != login_data.image:
-             await users_collection.update_one(
-                 {"email": login_data.email},
-                 {"$set": {"image": login_data.image}}
-             )
-             user["image"] = login_data.image
+    }
+    
+    for attempt in range(2):
+        try:
+            user = await users_collection.find_one_and_update(
+                {"email": login_data.email},
+                update,
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+            break
+        except DuplicateKeyError:
+            # A concurrent first login inserted it; the retry matches that user
+            if attempt:
+                raise
+    if login_data.image and user.get("image") != login_data.image:
+        # Write (and drop the cached user) only when the image really changed
+        result = await users_collection.update_one(
+            {"_id": user["_id"], "image": {"$ne": login_data.image}},
+            {"$set": {"image": login_data.image}},
+        )
+        if result.modified_count:
+            user_cache.invalidate(str(user["_id"]))
+        user["image"] = login_data.image
+    
+    if not user.get("is_active", True):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Account is disabled",
+        )
     
     # Generate Token
-    access_token = create_access_token(
-        data={"sub": str(user["_id"])},
-        expires_delta=timedelta(minutes=settings.access_token_expire_minutes)
-    )
+    tokens = issue_tokens(user)
     
     return {
         "id": str(user["_id"]),
@@ -173,6 +307,7 @@ async def social_login_api(login_data: SocialLogin):
         "role": user.get("role", "student"),
         "profile": user.get("profile", {}),
         "created_at": user["created_at"],
-        "access_token": access_token,
+        "access_token": tokens.access_token,
+        "refresh_token": tokens.refresh_token,
         "token_type": "bearer"
     }
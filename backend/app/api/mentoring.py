@@ -15,10 +15,10 @@ from app.db import (
     get_users_collection,
 )
 from app.api.auth import get_current_user
-from app.services.ml_service import MLService
+from app.services.mentor_matching import mentor_index
+from app.services.user_cache import user_cache
 
 router = APIRouter(prefix="/api/mentoring", tags=["mentoring"])
-ml_service = MLService()
 
 
 @router.get("/mentors", response_model=List[MentorProfileResponse])
@@ -55,6 +55,59 @@ async def get_mentors(
     return mentors
 
 
+@router.get("/match", response_model=List[MentorProfileResponse])
+async def match_mentors(
+    subjects: Optional[List[str]] = Query(default=None),
+    k: int = Query(default=10, ge=1, le=50),
+    current_user: dict = Depends(get_current_user)
+):
+    """Сурагчийн хичээлүүдэд хамгийн тохирох mentor-ууд (профайлын subjects-ийг анхдагчаар)"""
+    if subjects is None:
+        subjects = current_user.get("profile", {}).get("subjects", [])
+    if not mentor_index.is_loaded:
+        await mentor_index.refresh()
+    
+    ranked = mentor_index.top_k(subjects, k)
+    if not ranked:
+        return []
+    
+    mentors_col = get_mentor_profiles_collection()
+    users_col = get_users_collection()
+    profiles = {
+        str(m["_id"]): m
+        async for m in mentors_col.find({"_id": {"$in": [ObjectId(mentor_id) for mentor_id, _ in ranked]}})
+    }
+    users = {
+        str(u["_id"]): u
+        async for u in users_col.find(
+            {"_id": {"$in": [ObjectId(m["user_id"]) for m in profiles.values()]}},
+            {"name": 1}
+        )
+    }
+    
+    matches = []
+    for mentor_id, score in ranked:
+        mentor = profiles.get(mentor_id)
+        user = users.get(str(mentor["user_id"])) if mentor else None
+        if not user:
+            continue
+        matches.append(MentorProfileResponse(
+            id=mentor_id,
+            user_id=str(mentor["user_id"]),
+            user_name=user["name"],
+            university=mentor["university"],
+            major=mentor["major"],
+            subjects=mentor["subjects"],
+            experience=mentor.get("experience"),
+            bio=mentor.get("bio"),
+            availability=mentor.get("availability", []),
+            rating=mentor.get("rating", 0),
+            review_count=mentor.get("review_count", 0),
+            match_score=score
+        ))
+    return matches
+
+
 @router.post("/become-mentor", response_model=MentorProfileResponse)
 async def become_mentor(
     profile: MentorProfileCreate,
@@ -77,12 +130,16 @@ async def become_mentor(
     mentor_data["created_at"] = datetime.utcnow()
     
     result = await mentors_col.insert_one(mentor_data)
+    mentor_index.add(str(result.inserted_id), mentor_data["subjects"], mentor_data["rating"])
     
     # Update user role
     await users_col.update_one(
         {"_id": ObjectId(current_user["_id"])},
         {"$set": {"role": "mentor"}}
     )
+    user_cache.invalidate(current_user["_id"])
+    # Access tokens keep role "student" until refresh; not revoked on purpose,
+    # only the admin claim is trusted (see get_token_claims)
     
     return MentorProfileResponse(
         id=str(result.inserted_id),
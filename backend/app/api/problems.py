@@ -7,12 +7,12 @@ import io
 
 from app.db import get_problems_collection, get_problem_images_bucket
 from app.models import ProblemCreate, ProblemUpdate, ProblemResponse
-from app.api.auth import get_current_user
+from app.api.auth import get_current_user, get_token_claims
 
 router = APIRouter(prefix="/api/problems", tags=["problems"])
 
 
-async def get_current_admin(current_user: dict = Depends(get_current_user)):
+async def get_current_admin(current_user: dict = Depends(get_token_claims)):
     if current_user.get("role") != "admin":
         raise HTTPException(status_code=403, detail="You do not have admin privileges")
     return current_user
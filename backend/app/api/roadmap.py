@@ -5,10 +5,11 @@ from bson import ObjectId
 from app.models import RoadmapResponse, WeekPlan
 from app.db import get_roadmaps_collection, get_test_sessions_collection
 from app.api.auth import get_current_user
-from app.services.ml_service import MLService
+from app.services.ml_service import get_ml_service
+from app.services.session_writer import session_writer
 
 router = APIRouter(prefix="/api/roadmap", tags=["roadmap"])
-ml_service = MLService()
+ml_service = get_ml_service()
 
 
 @router.post("/generate", response_model=RoadmapResponse)
@@ -17,7 +18,8 @@ async def generate_roadmap(current_user: dict = Depends(get_current_user)):
     roadmaps_col = get_roadmaps_collection()
     sessions_col = get_test_sessions_collection()
     
-    # Get user's latest test session
+    # Get user's latest test session (including one still in the write-behind queue)
+    await session_writer.flush_user(current_user["_id"])
     latest_session = await sessions_col.find_one(
         {"user_id": current_user["_id"]},
         sort=[("completed_at", -1)]
@@ -1,65 +1,65 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from typing import List, Optional
 from datetime import datetime
 from bson import ObjectId
+from bson.errors import InvalidId
 
 from app.models import QuestionInTest, TestSubmit, TestResult
 from app.db import get_questions_collection, get_test_sessions_collection
-from app.api.auth import get_current_user
-from app.services.ml_service import MLService
+from app.api.auth import get_current_user, get_current_user_optional
+from app.services.ml_service import get_ml_service
+from app.services.question_pool import question_pool, build_question_in_test
+from app.services.session_writer import session_writer
+from app.services.seen_questions import load_seen, mark_seen
 
 router = APIRouter(prefix="/api/tests", tags=["tests"])
-ml_service = MLService()
+ml_service = get_ml_service()
 
 
 @router.get("/questions", response_model=List[QuestionInTest])
 async def get_questions(
     subject: Optional[str] = None,
-    count: int = Query(default=10, ge=1, le=50)
+    topic: Optional[str] = None,
+    difficulty: Optional[int] = Query(default=None, ge=1, le=10),
+    count: int = Query(default=10, ge=1, le=50),
+    current_user: Optional[dict] = Depends(get_current_user_optional)
 ):
-    """Тест авахад зориулсан асуултууд авах (auth шаардахгүй)"""
+    """Тест авахад зориулсан асуултууд авах (auth шаардахгүй, нэвтэрсэн бол үзсэн асуултыг алгасна)"""
+    seen = await load_seen(current_user["_id"]) if current_user else None
+    
+    questions = question_pool.sample(
+        count, subject=subject, topic=topic, difficulty=difficulty, exclude=seen
+    )
+    if questions is not None:
+        return questions
+    
+    # Pool is cold: fall back to Mongo $sample
     questions_col = get_questions_collection()
     
     query = {}
     if subject:
         query["subject"] = subject
+    if topic:
+        query["topic"] = topic
+    if difficulty is not None:
+        query["difficulty"] = difficulty
     
-    # Topic MN mapping
-    topic_mn_map = {
-        "algebra": "Алгебр",
-        "geometry": "Геометр",
-        "trigonometry": "Тригонометр",
-        "calculus": "Анализ",
-        "probability": "Магадлал",
-        "sequences": "Дараалал",
-        "functions": "Функц",
-        "vectors": "Вектор"
-    }
+    # Oversample so seen questions can be dropped without a $nin
+    sample_size = count * 3 if seen else count
     
     # Use to_list() instead of async for loop for reliability
     pipeline = [
         {"$match": query},
-        {"$sample": {"size": count}}
+        {"$sample": {"size": sample_size}}
     ]
     
-    docs = await questions_col.aggregate(pipeline).to_list(length=count)
-    
-    questions = []
-    for q in docs:
-        questions.append(QuestionInTest(
-            id=str(q["_id"]),
-            subject=q.get("subject", "Математик"),
-            topic=q.get("topic", ""),
-            topic_mn=topic_mn_map.get(q.get("topic", ""), q.get("topic_mn", "")),
-            difficulty=q.get("difficulty", 2),
-            content=q.get("content", q.get("question", "")),
-            options=q.get("options", []),
-            correct_answer=q.get("correct_answer"),
-            explanation=q.get("explanation", ""),
-            time_limit=q.get("time_limit", 60)
-        ))
-    
-    return questions
+    docs = await questions_col.aggregate(pipeline).to_list(length=sample_size)
+    if seen:
+        unseen = [q for q in docs if q.get("ordinal", -1) not in seen]
+        seen_docs = [q for q in docs if q.get("ordinal", -1) in seen]
+        docs = (unseen + seen_docs)[:count]
+    
+    return [build_question_in_test(q) for q in docs]
 
 
 @router.post("/submit", response_model=TestResult)
@@ -69,37 +69,51 @@ async def submit_test(
 ):
     """Тестийн хариултуудыг илгээж, үр дүн авах"""
     questions_col = get_questions_collection()
-    sessions_col = get_test_sessions_collection()
+    
+    # Fetch every referenced question in a single round-trip
+    answer_oids = [
+        ObjectId(answer.question_id) if ObjectId.is_valid(answer.question_id) else None
+        for answer in test_data.answers
+    ]
+    unique_oids = list({oid for oid in answer_oids if oid is not None})
+    questions_by_id = {}
+    if unique_oids:
+        docs = await questions_col.find(
+            {"_id": {"$in": unique_oids}},
+            {"correct_answer": 1, "topic": 1, "difficulty": 1, "ordinal": 1}
+        ).to_list(length=None)
+        questions_by_id = {q["_id"]: q for q in docs}
     
     # Calculate score
     correct_count = 0
     question_results = []
     topics_wrong = []
     
-    for answer in test_data.answers:
-        question = await questions_col.find_one({"_id": ObjectId(answer.question_id)})
+    for answer, oid in zip(test_data.answers, answer_oids):
+        question = questions_by_id.get(oid)
         if not question:
             continue
         
-        is_correct = question["correct_answer"] == answer.answer
+        is_correct = question.get("correct_answer") == answer.answer
         if is_correct:
             correct_count += 1
         else:
-            topics_wrong.append(question["topic"])
+            topics_wrong.append(question.get("topic", ""))
         
         question_results.append({
             "question_id": answer.question_id,
             "answer": answer.answer,
             "is_correct": is_correct,
-            "time_spent": answer.time_spent
+            "time_spent": answer.time_spent,
+            "topic": question.get("topic", ""),
+            "difficulty": question.get("difficulty", 1)
         })
     
     total = len(test_data.answers)
     score = (correct_count / total * 100) if total > 0 else 0
     
     # ML Prediction
-    predicted_level = ml_service.predict_level(question_results)
-    weak_topics = ml_service.detect_weaknesses(question_results, topics_wrong)
+    predicted_level, weak_topics, model_version = await ml_service.assess(question_results, topics_wrong)
     
     # Save session
     session = {
@@ -108,13 +122,17 @@ async def submit_test(
         "score": score,
         "predicted_level": predicted_level,
         "weak_topics": weak_topics,
+        "total_questions": total,
+        "correct_count": correct_count,
+        "ml_model_version": model_version,
         "completed_at": datetime.utcnow()
     }
     
-    result = await sessions_col.insert_one(session)
+    session_id = await session_writer.write(session)
+    await mark_seen(current_user["_id"], (q.get("ordinal") for q in questions_by_id.values()))
     
     return TestResult(
-        id=str(result.inserted_id),
+        id=str(session_id),
         score=score,
         total_questions=total,
         correct_count=correct_count,
@@ -124,25 +142,69 @@ async def submit_test(
     )
 
 
+# Never ship the answers array; legacy sessions without the denormalized
+# counts get them computed server-side until they are backfilled.
+HISTORY_PROJECTION = {
+    "score": 1,
+    "predicted_level": 1,
+    "weak_topics": 1,
+    "completed_at": 1,
+    "total_questions": {"$ifNull": ["$total_questions", {"$size": {"$ifNull": ["$questions", []]}}]},
+    "correct_count": {"$ifNull": ["$correct_count", {"$size": {"$filter": {
+        "input": {"$ifNull": ["$questions", []]},
+        "cond": "$$this.is_correct"
+    }}}]},
+}
+
+
+def _encode_history_cursor(session: dict) -> str:
+    return f"{session['completed_at'].isoformat()}|{session['_id']}"
+
+
+def _decode_history_cursor(cursor: str):
+    try:
+        completed_at, session_id = cursor.split("|")
+        return datetime.fromisoformat(completed_at), ObjectId(session_id)
+    except (ValueError, InvalidId):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 @router.get("/history", response_model=List[TestResult])
-async def get_test_history(current_user: dict = Depends(get_current_user)):
-    """Хэрэглэгчийн тестийн түүх"""
+async def get_test_history(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(default=20, ge=1, le=100),
+    current_user: dict = Depends(get_current_user)
+):
+    """Хэрэглэгчийн тестийн түүх (дараагийн хуудасны cursor X-Next-Cursor header-т)"""
     sessions_col = get_test_sessions_collection()
-    
-    cursor = sessions_col.find(
-        {"user_id": current_user["_id"]}
-    ).sort("completed_at", -1).limit(20)
-    
-    results = []
-    async for session in cursor:
-        results.append(TestResult(
+    # A just-submitted test may still be in the write-behind queue
+    await session_writer.flush_user(current_user["_id"])
+    
+    query = {"user_id": current_user["_id"]}
+    if cursor:
+        completed_at, session_id = _decode_history_cursor(cursor)
+        query["$or"] = [
+            {"completed_at": {"$lt": completed_at}},
+            {"completed_at": completed_at, "_id": {"$lt": session_id}},
+        ]
+    
+    sessions = await sessions_col.find(query, HISTORY_PROJECTION).sort(
+        [("completed_at", -1), ("_id", -1)]
+    ).limit(limit).to_list(length=limit)
+    
+    if len(sessions) == limit:
+        response.headers["X-Next-Cursor"] = _encode_history_cursor(sessions[-1])
+    
+    return [
+        TestResult(
             id=str(session["_id"]),
             score=session["score"],
-            total_questions=len(session["questions"]),
-            correct_count=sum(1 for q in session["questions"] if q["is_correct"]),
+            total_questions=session["total_questions"],
+            correct_count=session["correct_count"],
             predicted_level=session["predicted_level"],
             weak_topics=session["weak_topics"],
             completed_at=session["completed_at"]
-        ))
-    
-    return results
+        )
+        for session in sessions
+    ]
@@ -1,6 +1,7 @@
 from pydantic_settings import BaseSettings
 from pathlib import Path
 from functools import lru_cache
+from typing import Literal
 
 
 class Settings(BaseSettings):
@@ -9,6 +10,50 @@ class Settings(BaseSettings):
     secret_key: str = "your-super-secret-key-change-in-production"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    refresh_token_expire_days: int = 14
+    question_pool_max_age_seconds: int = 300
+    # Batch test_sessions inserts; history and roadmap flush the reading
+    # user's queued sessions first, admin aggregates may lag by one batch
+    session_write_behind: bool = False
+    session_write_batch_size: int = 200
+    session_write_flush_ms: int = 50
+    session_spill_path: str = str(Path(__file__).resolve().parents[1] / "spill" / "test_sessions.jsonl")
+    inference_max_batch_size: int = 64
+    inference_max_wait_ms: float = 2.0
+    # Flat-array tree evaluator instead of sklearn predict (same outputs)
+    inference_compiled_trees: bool = True
+    # LRU cache of level/weakness predictions (0 disables); features are
+    # rounded to this many decimals before lookup and prediction
+    prediction_cache_size: int = 4096
+    prediction_cache_decimals: int = 4
+    # Roadmap hours are precomputed for 1..N weeks available
+    roadmap_table_max_weeks: int = 52
+    # Mentor match index is rebuilt from mentor_profiles this often
+    mentor_index_refresh_seconds: int = 300
+    # Load and compile models in lifespan instead of on the first request
+    ml_warmup_on_startup: bool = True
+    # How often workers check ml/trained_models for a new version (0 disables)
+    ml_reload_interval_seconds: int = 60
+    # Columnar export written by scripts/export_feature_store.py
+    feature_store_path: str = str(Path(__file__).resolve().parents[2] / "ml" / "data" / "feature_store")
+    # Per-process cache of authenticated users keyed by token sub (0 disables)
+    user_cache_size: int = 10000
+    user_cache_ttl_seconds: float = 60.0
+    # bcrypt threads per worker; more concurrent logins wait in a queue
+    password_hash_workers: int = 4
+    # How often workers reload the token revocation list from Mongo. This is
+    # also how long another worker may keep honouring a revoked admin token
+    # (role/active change, logout), since admin claims skip the database
+    token_revocation_refresh_seconds: int = 30
+    # Failed logins allowed per email and attempts per client IP in a sliding
+    # window (0 disables that key); "mongo" shares the counters across workers
+    login_rate_limit_window_seconds: int = 300
+    login_rate_limit_per_email: int = 10
+    login_rate_limit_per_ip: int = 100
+    login_rate_limit_max_keys: int = 100000
+    login_rate_limit_backend: Literal["memory", "mongo"] = "memory"
+    # Take the client IP from X-Forwarded-For (only behind a trusted proxy)
+    trust_forwarded_for: bool = False
 
     class Config:
         env_file = str(Path(__file__).resolve().parents[1] / ".env")
@@ -1,31 +1,43 @@
 from .mongodb import (
     connect_to_mongo,
     close_mongo_connection,
+    ensure_indexes,
     get_database,
     get_users_collection,
     get_questions_collection,
     get_test_sessions_collection,
+    get_adaptive_sessions_collection,
+    get_question_seen_collection,
+    get_counters_collection,
     get_roadmaps_collection,
     get_mentorships_collection,
     get_mentor_profiles_collection,
     get_topics_collection,
     get_topic_views_collection,
     get_problems_collection,
+    get_revoked_tokens_collection,
+    get_login_attempts_collection,
     get_problem_images_bucket,
 )
 
 __all__ = [
     "connect_to_mongo",
     "close_mongo_connection",
+    "ensure_indexes",
     "get_database",
     "get_users_collection",
     "get_questions_collection",
     "get_test_sessions_collection",
+    "get_adaptive_sessions_collection",
+    "get_question_seen_collection",
+    "get_counters_collection",
     "get_roadmaps_collection",
     "get_mentorships_collection",
     "get_mentor_profiles_collection",
     "get_topics_collection",
     "get_topic_views_collection",
     "get_problems_collection",
+    "get_revoked_tokens_collection",
+    "get_login_attempts_collection",
     "get_problem_images_bucket",
 ]
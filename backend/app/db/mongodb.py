@@ -1,4 +1,5 @@
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorGridFSBucket
+from pymongo.errors import OperationFailure
 from app.config import get_settings
 
 settings = get_settings()
@@ -26,6 +27,36 @@ async def close_mongo_connection():
         print("Closed MongoDB connection")
 
 
+async def ensure_indexes():
+    """Шаардлагатай index-үүдийг үүсгэх (idempotent)"""
+    await db.db["test_sessions"].create_index(
+        [("user_id", 1), ("completed_at", -1), ("_id", -1)]
+    )
+    await db.db["questions"].create_index(
+        "content_hash",
+        unique=True,
+        partialFilterExpression={"content_hash": {"$exists": True}},
+    )
+    await db.db["questions"].create_index(
+        "ordinal",
+        unique=True,
+        partialFilterExpression={"ordinal": {"$exists": True}},
+    )
+    # Revocations are dropped once the tokens they cover have expired
+    await db.db["revoked_tokens"].create_index("expires_at", expireAfterSeconds=0)
+    await db.db["revoked_tokens"].create_index(
+        "jti",
+        unique=True,
+        partialFilterExpression={"jti": {"$exists": True}},
+    )
+    await db.db["login_attempts"].create_index("expires_at", expireAfterSeconds=0)
+    # Backs the social-login upsert; fails if duplicate emails already exist
+    try:
+        await db.db["users"].create_index("email", unique=True)
+    except OperationFailure as e:
+        print(f"[ERROR] Unique users.email index not created (merge duplicate accounts first): {e}")
+
+
 def get_database():
     """Database instance авах"""
     return db.db
@@ -44,6 +75,18 @@ def get_test_sessions_collection():
     return db.db["test_sessions"]
 
 
+def get_adaptive_sessions_collection():
+    return db.db["adaptive_sessions"]
+
+
+def get_question_seen_collection():
+    return db.db["question_seen"]
+
+
+def get_counters_collection():
+    return db.db["counters"]
+
+
 def get_roadmaps_collection():
     return db.db["roadmaps"]
 
@@ -68,5 +111,13 @@ def get_problems_collection():
     return db.db["problems"]
 
 
+def get_revoked_tokens_collection():
+    return db.db["revoked_tokens"]
+
+
+def get_login_attempts_collection():
+    return db.db["login_attempts"]
+
+
 def get_problem_images_bucket():
     return AsyncIOMotorGridFSBucket(db.db, bucket_name="problem_images")
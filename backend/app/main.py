@@ -1,11 +1,19 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import asyncio
 
-from app.db import connect_to_mongo, close_mongo_connection, get_users_collection
-from app.api import auth_router, tests_router, roadmap_router, mentoring_router, topics_router, problems_router
+from app.db import connect_to_mongo, close_mongo_connection, ensure_indexes, get_users_collection
+from app.api import auth_router, tests_router, adaptive_router, roadmap_router, mentoring_router, topics_router, problems_router
 from app.api.admin import router as admin_router
-from app.api.auth import get_password_hash
+from app.services.question_pool import question_pool
+from app.services.session_writer import session_writer
+from app.services.seen_questions import assign_missing_ordinals
+from app.services.ml_service import get_ml_service
+from app.services.mentor_matching import mentor_index
+from app.services.password_hasher import password_hasher
+from app.services.token_revocation import revocation_list
+from app.config import get_settings
 from datetime import datetime
 
 
@@ -13,6 +21,19 @@ from datetime import datetime
 async def lifespan(app: FastAPI):
     # Startup
     await connect_to_mongo()
+    await ensure_indexes()
+    
+    # One shared model registry per process. Routers hold the same instance
+    # (created on import, which loads nothing); loading happens here so the
+    # first requests don't pay for deserialization and compilation
+    ml_service = get_ml_service()
+    settings = get_settings()
+    if settings.ml_warmup_on_startup:
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, ml_service.warm_up)
+            print(f"[OK] ML models warmed up: {ml_service.model_version}")
+        except Exception as e:
+            print(f"[ERROR] ML warm-up failed, models will load on first use: {e}")
     
     # Create default admin user
     try:
@@ -24,7 +45,7 @@ async def lifespan(app: FastAPI):
             print("Creating default admin user...")
             admin_user = {
                 "email": admin_email,
-                "hashed_password": get_password_hash("admin123"),
+                "hashed_password": await password_hasher.hash("admin123"),
                 "name": "System Administrator",
                 "role": "admin",
                 "profile": {},
@@ -38,9 +59,43 @@ async def lifespan(app: FastAPI):
                 await users.update_one({"email": admin_email}, {"$set": {"role": "admin"}})
     except Exception as e:
         print(f"Error creating admin user: {e}")
+    
+    # Every question needs an ordinal for the per-user seen bitmap
+    assigned = await assign_missing_ordinals()
+    if assigned:
+        print(f"Assigned ordinals to {assigned} questions")
+    
+    # Keep the in-memory question pool warm
+    pool_task = asyncio.create_task(question_pool.run_periodic_refresh())
+    
+    # Mentor match index; other workers' become-mentor writes arrive on refresh
+    mentor_task = asyncio.create_task(
+        mentor_index.run_periodic_refresh(settings.mentor_index_refresh_seconds)
+    )
+    
+    # Revoked tokens; this worker's own revocations apply immediately
+    revocation_task = asyncio.create_task(
+        revocation_list.run_periodic_refresh(settings.token_revocation_refresh_seconds)
+    )
+    
+    # Pick up new model versions without a restart
+    reload_task = None
+    if settings.ml_reload_interval_seconds > 0:
+        reload_task = asyncio.create_task(
+            ml_service.run_periodic_reload(settings.ml_reload_interval_seconds)
+        )
+    
+    # Replays any spilled sessions before accepting writes
+    await session_writer.start()
         
     yield
     # Shutdown
+    pool_task.cancel()
+    mentor_task.cancel()
+    revocation_task.cancel()
+    if reload_task is not None:
+        reload_task.cancel()
+    await session_writer.stop()
     await close_mongo_connection()
 
 
@@ -58,11 +113,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Routers
 app.include_router(auth_router)
 app.include_router(tests_router)
+app.include_router(adaptive_router)
 app.include_router(roadmap_router)
 app.include_router(mentoring_router)
 app.include_router(topics_router)
@@ -1,4 +1,4 @@
-from .user import UserCreate, UserResponse, UserInDB, Token, TokenData, UserProfile, UserUpdate, SocialLogin
+from .user import UserCreate, UserResponse, UserInDB, Token, RefreshRequest, TokenData, UserProfile, UserUpdate, SocialLogin
 from .test import (
     QuestionBase,
     QuestionCreate,
@@ -8,6 +8,8 @@ from .test import (
     TestSubmit,
     TestResult,
     TestSessionInDB,
+    AdaptiveStart,
+    AdaptiveStep,
 )
 from .roadmap import WeekPlan, RoadmapCreate, RoadmapResponse, RoadmapInDB
 from .mentoring import (
@@ -27,6 +29,7 @@ __all__ = [
     "UserResponse",
     "UserInDB",
     "Token",
+    "RefreshRequest",
     "TokenData",
     "UserProfile",
     "UserUpdate",
@@ -39,6 +42,8 @@ __all__ = [
     "TestSubmit",
     "TestResult",
     "TestSessionInDB",
+    "AdaptiveStart",
+    "AdaptiveStep",
     "WeekPlan",
     "RoadmapCreate",
     "RoadmapResponse",
@@ -28,6 +28,7 @@ class MentorProfileResponse(MentorProfileBase):
     user_name: str
     rating: float = 0.0
     review_count: int = 0
+    match_score: Optional[float] = None
 
 
 class MentorProfileInDB(MentorProfileBase):
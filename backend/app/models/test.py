@@ -64,4 +64,22 @@ class TestSessionInDB(BaseModel):
     score: float
     predicted_level: int
     weak_topics: List[str]
+    total_questions: int = 0
+    correct_count: int = 0
+    ml_model_version: Optional[str] = None
     completed_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+# Adaptive Test Models
+class AdaptiveStart(BaseModel):
+    subject: Optional[str] = None
+    max_questions: int = Field(default=20, ge=1, le=50)
+
+
+class AdaptiveStep(BaseModel):
+    session_id: str
+    question: Optional[QuestionInTest] = None
+    answered: int
+    ability: float
+    standard_error: float
+    finished: bool = False
@@ -1,3 +1,4 @@
-from .ml_service import MLService
+from .ml_service import MLService, get_ml_service
+from .question_pool import QuestionPool, question_pool
 
-__all__ = ["MLService"]
+__all__ = ["MLService", "get_ml_service", "QuestionPool", "question_pool"]
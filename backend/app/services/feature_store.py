@@ -0,0 +1,147 @@
+"""
+Columnar, date-partitioned feature store on NumPy .npy files
+
+Layout:
+    <root>/<dataset>/_state.json          last exported _id, row count
+    <root>/<dataset>/_dictionaries.json   string columns -> code lists
+    <root>/<dataset>/date=YYYY-MM-DD/part-<first _id>/<column>.npy
+
+Each export run appends new parts; readers memory-map the column files,
+so training and analytics read features without touching MongoDB.
+iter_parts() is zero-copy; load() concatenates parts into RAM for callers
+that need one contiguous array (e.g. sklearn fit). Like
+features.py this module only depends on NumPy, so ml/notebooks scripts
+can load it directly.
+"""
+
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+
+def _write_json(path: Path, data: Dict):
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+class FeatureStore:
+    """Dataset бүрийг огноогоор хуваасан .npy баганууд"""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self._dictionaries: Dict[str, Dict[str, Dict[str, int]]] = {}
+
+    def dataset_dir(self, dataset: str) -> Path:
+        return self.root / dataset
+
+    # ---- state ----------------------------------------------------------
+
+    def state(self, dataset: str) -> Dict:
+        path = self.dataset_dir(dataset) / "_state.json"
+        return json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+
+    def save_state(self, dataset: str, state: Dict):
+        self.dataset_dir(dataset).mkdir(parents=True, exist_ok=True)
+        _write_json(self.dataset_dir(dataset) / "_state.json", state)
+
+    # ---- dictionary-encoded string columns ------------------------------
+
+    def _dictionary(self, dataset: str) -> Dict[str, Dict[str, int]]:
+        if dataset not in self._dictionaries:
+            path = self.dataset_dir(dataset) / "_dictionaries.json"
+            stored = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+            self._dictionaries[dataset] = {
+                column: {value: code for code, value in enumerate(values)}
+                for column, values in stored.items()
+            }
+        return self._dictionaries[dataset]
+
+    def encode(self, dataset: str, column: str, values: Iterable[Optional[str]]) -> np.ndarray:
+        """Утгуудыг int32 код болгох (шинэ утгыг толь бичигт нэмнэ; None -> -1)"""
+        codes = self._dictionary(dataset).setdefault(column, {})
+        return np.array(
+            [-1 if v is None else codes.setdefault(v, len(codes)) for v in values],
+            dtype=np.int32,
+        )
+
+    def decode(self, dataset: str, column: str, codes: np.ndarray) -> np.ndarray:
+        values = list(self._dictionary(dataset).get(column, {}))
+        lookup = np.array(values + [None], dtype=object)
+        return lookup[np.asarray(codes)]
+
+    def save_dictionaries(self, dataset: str):
+        self.dataset_dir(dataset).mkdir(parents=True, exist_ok=True)
+        _write_json(
+            self.dataset_dir(dataset) / "_dictionaries.json",
+            {column: list(codes) for column, codes in self._dictionary(dataset).items()},
+        )
+
+    # ---- writing --------------------------------------------------------
+
+    def write_part(self, dataset: str, date: str, part: str, columns: Dict[str, np.ndarray]):
+        """
+        Нэг partition-д шинэ part бичих
+
+        The part is written to a temp dir and renamed, so readers never see
+        half a part; rewriting the same part name replaces it.
+        """
+        partition = self.dataset_dir(dataset) / f"date={date}"
+        partition.mkdir(parents=True, exist_ok=True)
+        final = partition / f"part-{part}"
+        tmp = partition / f".tmp-part-{part}"
+        if tmp.exists():
+            shutil.rmtree(tmp)
+        tmp.mkdir()
+        for name, values in columns.items():
+            np.save(tmp / f"{name}.npy", values)
+        if final.exists():
+            shutil.rmtree(final)
+        os.replace(tmp, final)
+
+    # ---- reading --------------------------------------------------------
+
+    def partitions(self, dataset: str, start: Optional[str] = None, end: Optional[str] = None) -> List[str]:
+        """Огнооны partition-ууд (start, end нь YYYY-MM-DD, хоёулаа багтана)"""
+        directory = self.dataset_dir(dataset)
+        if not directory.exists():
+            return []
+        dates = sorted(p.name[5:] for p in directory.glob("date=*") if p.is_dir())
+        return [d for d in dates if (start is None or d >= start) and (end is None or d <= end)]
+
+    def iter_parts(
+        self,
+        dataset: str,
+        columns: List[str],
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ) -> Iterator[Dict[str, np.ndarray]]:
+        """Part бүрийн баганыг memory-map хийж өгөх (zero-copy)"""
+        for date in self.partitions(dataset, start, end):
+            for part in sorted((self.dataset_dir(dataset) / f"date={date}").glob("part-*")):
+                yield {name: np.load(part / f"{name}.npy", mmap_mode="r") for name in columns}
+
+    def load(
+        self,
+        dataset: str,
+        columns: List[str],
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Хугацааны мужийн багануудыг нэг массив болгох
+
+        A single part comes back memory-mapped; several parts are copied
+        into one in-memory array per column. Use iter_parts() to stream
+        large ranges without copying.
+        """
+        parts = list(self.iter_parts(dataset, columns, start, end))
+        if len(parts) == 1:
+            return parts[0]
+        if not parts:
+            return {}
+        return {name: np.concatenate([p[name] for p in parts]) for name in columns}
@@ -0,0 +1,106 @@
+"""
+ML feature definition shared by online inference and offline training
+
+This module only depends on NumPy so ml/notebooks/train_models.py can load
+it directly. Bump FEATURE_VERSION whenever a feature changes meaning.
+"""
+
+import numpy as np
+from typing import Dict, Iterable, List, Sequence
+
+FEATURE_VERSION = 2
+
+TOPICS = ['algebra', 'geometry', 'trigonometry', 'calculus', 'probability', 'sequences', 'functions', 'vectors']
+LEVEL_TOPICS = TOPICS[:5]
+
+LEVEL_FEATURES = [
+    'correct_ratio',
+    'avg_time_per_question',
+    'hard_correct_ratio',
+] + [f'{topic}_score' for topic in LEVEL_TOPICS]
+WEAKNESS_FEATURES = [f'{topic}_score' for topic in TOPICS]
+
+DEFAULT_TIME = 60
+HARD_DIFFICULTY = 3
+# Level topic scores are percentages, weakness topic scores are ratios
+DEFAULT_LEVEL_TOPIC_SCORE = 50.0
+DEFAULT_WEAKNESS_TOPIC_SCORE = 0.5
+
+_TOPIC_INDEX = {topic: i for i, topic in enumerate(TOPICS)}
+
+
+def answer_time(result: Dict) -> float:
+    """Хариулахад зарцуулсан хугацаа (submit нь time_spent, хуучин өгөгдөл time_taken)"""
+    value = result.get("time_spent", result.get("time_taken"))
+    return DEFAULT_TIME if value is None else value
+
+
+class FeatureMatrix:
+    """Session бүрийн feature мөрүүд"""
+
+    def __init__(self, level: np.ndarray, weakness: np.ndarray, correct_ratio: np.ndarray):
+        self.level = level
+        self.weakness = weakness
+        self.correct_ratio = correct_ratio
+
+    def __len__(self) -> int:
+        return len(self.level)
+
+
+def extract_feature_matrix(sessions: Iterable[Sequence[Dict]]) -> FeatureMatrix:
+    """
+    Олон session-ий feature-уудыг нэг дамжилтаар тооцох
+
+    Args:
+        sessions: Session бүрийн question_results
+
+    Returns:
+        FeatureMatrix: level (n, len(LEVEL_FEATURES)), weakness (n, len(WEAKNESS_FEATURES))
+    """
+    session_idx: List[int] = []
+    correct: List[bool] = []
+    times: List[float] = []
+    difficulty: List[float] = []
+    topic: List[int] = []
+    n = 0
+    for i, results in enumerate(sessions):
+        n = i + 1
+        for q in results:
+            session_idx.append(i)
+            correct.append(bool(q.get("is_correct", False)))
+            times.append(answer_time(q))
+            difficulty.append(q.get("difficulty") or 1)
+            topic.append(_TOPIC_INDEX.get(q.get("topic"), -1))
+
+    s = np.asarray(session_idx, dtype=np.int64)
+    c = np.asarray(correct, dtype=np.float64)
+    t = np.asarray(times, dtype=np.float64)
+    hard = np.asarray(difficulty, dtype=np.float64) >= HARD_DIFFICULTY
+    k = np.asarray(topic, dtype=np.int64)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        total = np.bincount(s, minlength=n)
+        correct_ratio = np.where(total > 0, np.bincount(s, weights=c, minlength=n) / total, 0.0)
+        avg_time = np.where(total > 0, np.bincount(s, weights=t, minlength=n) / total, DEFAULT_TIME)
+
+        hard_total = np.bincount(s, weights=hard, minlength=n)
+        hard_correct = np.bincount(s, weights=hard * c, minlength=n)
+        hard_ratio = np.where(hard_total > 0, hard_correct / hard_total, 0.0)
+
+        known = k >= 0
+        cell = s[known] * len(TOPICS) + k[known]
+        topic_total = np.bincount(cell, minlength=n * len(TOPICS)).reshape(n, len(TOPICS))
+        topic_correct = np.bincount(cell, weights=c[known], minlength=n * len(TOPICS)).reshape(n, len(TOPICS))
+        topic_ratio = topic_correct / topic_total
+
+    answered = topic_total > 0
+    weakness = np.where(answered, topic_ratio, DEFAULT_WEAKNESS_TOPIC_SCORE)
+    level_topics = np.where(answered, topic_ratio * 100, DEFAULT_LEVEL_TOPIC_SCORE)[:, :len(LEVEL_TOPICS)]
+
+    level = np.column_stack([correct_ratio, avg_time, hard_ratio, level_topics])
+    return FeatureMatrix(level, weakness, correct_ratio)
+
+
+def extract_features(question_results: Sequence[Dict]) -> FeatureMatrix:
+    """Нэг session-ий feature-ууд (1 мөртэй FeatureMatrix)"""
+    return extract_feature_matrix([question_results])
@@ -0,0 +1,66 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+# All dispatchers share this pool, so batches of different models (and of
+# the same model) may run concurrently and finish in any order; each batch
+# resolves its own futures, so order does not matter. sklearn releases the
+# GIL for most of predict, and the event loop stays free meanwhile.
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="inference")
+
+
+class BatchDispatcher:
+    """
+    Зэрэг ирсэн inference хүсэлтүүдийг нэг NumPy batch болгон нэгтгэх
+
+    Эхний мөр ирснээс max_wait секундын дараа эсвэл max_batch_size мөр
+    хуримтлагдмагц batch-ийг worker thread дээр ажиллуулж, хүсэлт бүрт
+    өөрийн үр дүнг буцаана.
+    """
+
+    def __init__(
+        self,
+        predict: Callable[[np.ndarray], np.ndarray],
+        max_batch_size: int,
+        max_wait: float,
+    ):
+        self.predict = predict
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._pending: List[Tuple[np.ndarray, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    async def submit(self, row: np.ndarray):
+        """Нэг мөрийн (1-D) таамаглалыг batch-аар дамжуулж авах"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((row, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            asyncio.get_running_loop().create_task(self._run(batch))
+
+    async def _run(self, batch: List[Tuple[np.ndarray, asyncio.Future]]):
+        rows = np.vstack([row for row, _ in batch])
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(_executor, self.predict, rows)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
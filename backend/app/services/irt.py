@@ -0,0 +1,141 @@
+import random
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Logistic scaling constant (normal-ogive approximation)
+D = 1.7
+
+# Quadrature grid for EAP ability estimation, standard normal prior
+QUADRATURE = np.linspace(-4.0, 4.0, 61)
+LOG_PRIOR = -0.5 * QUADRATURE ** 2
+
+# Grid on which item information rankings are precomputed
+SELECTION_GRID = np.linspace(-4.0, 4.0, 81)
+SELECTION_TOP_K = 64
+# Randomesque exposure control: pick among the N most informative items
+SELECTION_RANDOMESQUE = 5
+
+
+def difficulty_to_b(difficulty: int) -> float:
+    """1-10 хүндийн зэргийг IRT b параметр (logit) руу буулгах"""
+    return (float(difficulty) - 5.5) / 1.5
+
+
+def theta_to_level(theta: float) -> int:
+    """Чадварын үнэлгээг (theta) 1-10 түвшин рүү хөрвүүлэх"""
+    return int(np.clip(np.rint(5.5 + 1.5 * theta), 1, 10))
+
+
+def probability(theta, a, b, c):
+    """3PL моделийн зөв хариулах магадлал"""
+    return c + (1.0 - c) / (1.0 + np.exp(-D * a * (theta - b)))
+
+
+def information(theta, a, b, c):
+    """3PL моделийн Fisher information"""
+    p = probability(theta, a, b, c)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        info = (D * a) ** 2 * ((p - c) / (1.0 - c)) ** 2 * (1.0 - p) / p
+    return np.nan_to_num(info, nan=0.0)
+
+
+class ItemBank:
+    """
+    Асуултын сангийн IRT параметрүүдийг NumPy массив хэлбэрээр хадгалах
+
+    Item information-ийг SELECTION_GRID-ийн цэг бүр дээр урьдчилан эрэмбэлдэг
+    тул дараагийн асуулт сонгох нь O(SELECTION_TOP_K) болно.
+    """
+
+    def __init__(
+        self,
+        question_ids: Sequence[str],
+        a: np.ndarray,
+        b: np.ndarray,
+        c: np.ndarray,
+    ):
+        self.question_ids = list(question_ids)
+        self.index: Dict[str, int] = {qid: i for i, qid in enumerate(self.question_ids)}
+        self.a = np.asarray(a, dtype=np.float64)
+        self.b = np.asarray(b, dtype=np.float64)
+        self.c = np.asarray(c, dtype=np.float64)
+        self._ranked = self._rank_items()
+
+    def __len__(self) -> int:
+        return len(self.question_ids)
+
+    def _rank_items(self) -> np.ndarray:
+        n_items = len(self.question_ids)
+        k = min(SELECTION_TOP_K, n_items)
+        ranked = np.empty((len(SELECTION_GRID), k), dtype=np.int32)
+        if k == 0:
+            return ranked
+        for g, theta in enumerate(SELECTION_GRID):
+            info = information(theta, self.a, self.b, self.c)
+            top = np.argpartition(-info, k - 1)[:k]
+            ranked[g] = top[np.argsort(-info[top], kind="stable")]
+        return ranked
+
+    def estimate_ability(
+        self,
+        items: Sequence[int],
+        responses: Sequence[bool],
+    ) -> Tuple[float, float]:
+        """
+        EAP аргаар чадварыг үнэлэх
+
+        Returns:
+            (theta, standard_error)
+        """
+        log_post = LOG_PRIOR.copy()
+        if len(items):
+            idx = np.asarray(items, dtype=np.int64)
+            u = np.asarray(responses, dtype=bool)[:, None]
+            p = probability(QUADRATURE[None, :], self.a[idx, None], self.b[idx, None], self.c[idx, None])
+            log_post += np.where(u, np.log(p), np.log1p(-p)).sum(axis=0)
+        post = np.exp(log_post - log_post.max())
+        post /= post.sum()
+        theta = float(post @ QUADRATURE)
+        se = float(np.sqrt(post @ (QUADRATURE - theta) ** 2))
+        return theta, se
+
+    def select_next(self, theta: float, exclude: Iterable[int]) -> Optional[int]:
+        """Хамгийн их Fisher information-тэй, асуугаагүй асуултын ordinal"""
+        if not self.question_ids:
+            return None
+        excluded = set(exclude)
+        g = int(np.abs(SELECTION_GRID - theta).argmin())
+        candidates = []
+        for item in self._ranked[g]:
+            if int(item) not in excluded:
+                candidates.append(int(item))
+                if len(candidates) == SELECTION_RANDOMESQUE:
+                    break
+        if candidates:
+            return random.choice(candidates)
+
+        # Every precomputed candidate was used: score the whole bank
+        info = information(theta, self.a, self.b, self.c)
+        if excluded:
+            info[np.fromiter(excluded, dtype=np.int64)] = -np.inf
+        best = int(info.argmax())
+        return None if np.isneginf(info[best]) else best
+
+    @classmethod
+    def from_questions(
+        cls,
+        question_ids: List[str],
+        difficulties: List[int],
+        calibrated: List[Optional[Tuple[float, float, float]]],
+    ) -> "ItemBank":
+        """Калибровласан параметр байхгүй асуултад хүндийн зэргээс b-г тооцно"""
+        n = len(question_ids)
+        a = np.ones(n)
+        b = np.empty(n)
+        c = np.zeros(n)
+        for i, (difficulty, params) in enumerate(zip(difficulties, calibrated)):
+            if params is not None:
+                a[i], b[i], c[i] = params
+            else:
+                b[i] = difficulty_to_b(difficulty)
+        return cls(question_ids, a, b, c)
@@ -0,0 +1,222 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta
+from typing import Any, Collection, Deque, Dict, Optional
+
+from pymongo import UpdateOne
+
+from app.config import get_settings
+from app.db import get_login_attempts_collection
+
+settings = get_settings()
+
+
+class RateLimitBackend(ABC):
+    """
+    Sliding window тоолуурын interface
+
+    An attempt is checked against every key first and recorded only if all
+    allow it; rejected attempts are never recorded. So a key that keeps
+    being hammered unlocks once its window has passed, and an attempt
+    refused by one key (e.g. the IP) costs nothing on the others (e.g. the
+    victim's email).
+    """
+
+    @abstractmethod
+    async def hit(self, limits: Dict[str, int], window: float, record: Collection[str]) -> float:
+        """
+        Оролдлогыг бүх key дээр шалгаад, record-д байгаа key-үүд дээр тоолох
+
+        limits maps key -> attempts allowed per window. Returns 0 if the
+        attempt is allowed (and recorded), otherwise the seconds until every
+        key allows it again.
+        """
+
+    @abstractmethod
+    async def add(self, key: str, limit: int, window: float):
+        """Зөвшөөрөгдсөн оролдлогын үр дүнг (e.g. failure) дараа нь тоолох"""
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """
+    Нэг process доторх яг sliding window
+
+    A key keeps at most `limit` timestamps and at most max_keys keys are
+    tracked, least recently used dropped first, so memory is bounded however
+    many emails or IPs an attacker cycles through. Expired timestamps fall
+    off on every hit. Check and record run without an await in between, so
+    they are atomic on the event loop.
+    """
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._windows: "OrderedDict[str, Deque[float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._windows)
+
+    def _attempts(self, key: str) -> Deque[float]:
+        attempts = self._windows.get(key)
+        if attempts is None:
+            attempts = self._windows[key] = deque()
+            while len(self._windows) > self.max_keys:
+                self._windows.popitem(last=False)
+        self._windows.move_to_end(key)
+        return attempts
+
+    async def hit(self, limits: Dict[str, int], window: float, record: Collection[str]) -> float:
+        now = time.monotonic()
+        windows = {key: self._attempts(key) for key in limits}
+        retry_after = 0.0
+        for key, attempts in windows.items():
+            while attempts and attempts[0] <= now - window:
+                attempts.popleft()
+            if len(attempts) >= limits[key]:
+                retry_after = max(retry_after, attempts[0] + window - now)
+        if retry_after > 0:
+            return retry_after
+        for key in record:
+            windows[key].append(now)
+        return 0.0
+
+    async def add(self, key: str, limit: int, window: float):
+        attempts = self._attempts(key)
+        attempts.append(time.monotonic())
+        # Concurrent attempts can all pass hit() before any is added
+        while len(attempts) > limit:
+            attempts.popleft()
+
+
+class MongoRateLimitBackend(RateLimitBackend):
+    """
+    Бүх worker-т нийтлэг, login_attempts collection дээрх тоолуур
+
+    Approximates the sliding window from two fixed buckets: the current
+    bucket's count plus the previous bucket's count weighted by how much
+    of it still overlaps the window. Buckets expire through a TTL index.
+    One read checks every key, one bulk write records the attempt; between
+    the two another worker may record too, so a burst can overshoot the
+    limit by roughly the number of workers.
+    """
+
+    async def hit(self, limits: Dict[str, int], window: float, record: Collection[str]) -> float:
+        collection = get_login_attempts_collection()
+        now = time.time()
+        bucket = int(now // window)
+        elapsed = now - bucket * window
+
+        ids = [f"{key}:{b}" for key in limits for b in (bucket - 1, bucket)]
+        cursor = collection.find({"_id": {"$in": ids}}, {"count": 1})
+        counts = {doc["_id"]: doc["count"] async for doc in cursor}
+
+        retry_after = 0.0
+        for key, limit in limits.items():
+            previous = counts.get(f"{key}:{bucket - 1}", 0)
+            current = counts.get(f"{key}:{bucket}", 0)
+            if current + 1 > limit:
+                # Only the next bucket can make room
+                retry_after = max(retry_after, window - elapsed)
+            elif current + 1 + previous * (1 - elapsed / window) > limit:
+                # Wait until enough of the previous bucket has slid out
+                allowed_at = window * (1 - (limit - 1 - current) / previous)
+                retry_after = max(retry_after, allowed_at - elapsed)
+        if retry_after > 0:
+            return retry_after
+        if record:
+            await collection.bulk_write([self._increment(key, window) for key in record], ordered=False)
+        return 0.0
+
+    async def add(self, key: str, limit: int, window: float):
+        await get_login_attempts_collection().bulk_write([self._increment(key, window)])
+
+    @staticmethod
+    def _increment(key: str, window: float) -> UpdateOne:
+        bucket = int(time.time() // window)
+        expires_at = datetime.utcnow() + timedelta(seconds=2 * window)
+        return UpdateOne(
+            {"_id": f"{key}:{bucket}"},
+            {"$inc": {"count": 1}, "$setOnInsert": {"expires_at": expires_at}},
+            upsert=True,
+        )
+
+
+class LoginLimiter:
+    """
+    Email ба IP тус бүрээр login оролдлогыг хязгаарлах
+
+    The IP key counts every attempt. The email key counts only failed ones
+    (failed() after a wrong password), so successful logins never use up an
+    account's budget. Attempts in flight when the budget runs out may each
+    fail once more before it is enforced; the IP limit bounds that.
+    """
+
+    def __init__(self, backend: RateLimitBackend, per_email: int, per_ip: int, window: float):
+        self.backend = backend
+        self.per_email = per_email
+        self.per_ip = per_ip
+        self.window = window
+        self.allowed = 0
+        self.rejected = 0
+        self.failures = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > 0 and (self.per_email > 0 or self.per_ip > 0)
+
+    @staticmethod
+    def _email_key(email: str) -> str:
+        return f"email:{email.strip().lower()}"
+
+    async def check(self, email: str, ip: Optional[str]) -> float:
+        """Оролдлогыг тоолж, хэтэрсэн бол хүлээх секундыг буцаах (0 = зөвшөөрнө)"""
+        if not self.enabled:
+            return 0.0
+        limits = {}
+        if self.per_email > 0:
+            limits[self._email_key(email)] = self.per_email
+        record = []
+        if self.per_ip > 0 and ip:
+            record.append(f"ip:{ip}")
+            limits[f"ip:{ip}"] = self.per_ip
+        retry_after = await self.backend.hit(limits, self.window, record) if limits else 0.0
+        if retry_after > 0:
+            self.rejected += 1
+        else:
+            self.allowed += 1
+        return retry_after
+
+    async def failed(self, email: str):
+        """Буруу нууц үгийг email-ийн хязгаарт тоолох"""
+        if not self.enabled or self.per_email <= 0:
+            return
+        self.failures += 1
+        await self.backend.add(self._email_key(email), self.per_email, self.window)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {
+            "backend": type(self.backend).__name__,
+            "window_seconds": self.window,
+            "per_email": self.per_email,
+            "per_ip": self.per_ip,
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+            "failures": self.failures,
+        }
+        if isinstance(self.backend, MemoryRateLimitBackend):
+            stats["tracked_keys"] = len(self.backend)
+        return stats
+
+
+def _build_backend() -> RateLimitBackend:
+    if settings.login_rate_limit_backend == "mongo":
+        return MongoRateLimitBackend()
+    return MemoryRateLimitBackend(settings.login_rate_limit_max_keys)
+
+
+login_limiter = LoginLimiter(
+    _build_backend(),
+    per_email=settings.login_rate_limit_per_email,
+    per_ip=settings.login_rate_limit_per_ip,
+    window=settings.login_rate_limit_window_seconds,
+)
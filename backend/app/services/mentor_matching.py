@@ -0,0 +1,120 @@
+import asyncio
+import heapq
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.db import get_mentor_profiles_collection
+
+# One shared subject outweighs any rating difference (ratings are 0-5)
+SUBJECT_WEIGHT = 10
+
+
+def mentor_score(overlap: int, rating: float) -> float:
+    """Сурагч-mentor тохирлын оноо: давхцсан хичээл бүрт 10 + үнэлгээ"""
+    return overlap * SUBJECT_WEIGHT + rating
+
+
+class MentorIndex:
+    """
+    Mentor-уудыг хичээлээр индексжүүлж, хамгийн тохирох k-г олох
+
+    Mentors are grouped by their exact subject set (a bit mask over the
+    subject vocabulary); each group keeps its mentors sorted by rating.
+    For a query, every group's overlap with the student's subjects is one
+    AND + popcount, and a heap over the group heads yields the top k in
+    O(groups + k log groups), independent of the number of mentors.
+    """
+
+    def __init__(self):
+        self._subject_bits: Dict[str, int] = {}
+        # subject mask -> [(-rating, mentor_id)] ascending
+        self._groups: Dict[int, List[Tuple[float, str]]] = {}
+        self._by_id: Dict[str, Tuple[int, float]] = {}
+        self._loaded = False
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    def _mask(self, subjects: Iterable[str], grow: bool) -> int:
+        mask = 0
+        for subject in subjects:
+            bit = self._subject_bits.get(subject)
+            if bit is None:
+                if not grow:
+                    continue
+                bit = self._subject_bits[subject] = len(self._subject_bits)
+            mask |= 1 << bit
+        return mask
+
+    def add(self, mentor_id: str, subjects: Iterable[str], rating: float):
+        """Mentor нэмэх эсвэл шинэчлэх"""
+        self.remove(mentor_id)
+        mask = self._mask(subjects, grow=True)
+        rating = float(rating or 0.0)
+        insort(self._groups.setdefault(mask, []), (-rating, mentor_id))
+        self._by_id[mentor_id] = (mask, rating)
+
+    def remove(self, mentor_id: str):
+        entry = self._by_id.pop(mentor_id, None)
+        if entry is None:
+            return
+        mask, rating = entry
+        group = self._groups[mask]
+        del group[bisect_left(group, (-rating, mentor_id))]
+        if not group:
+            del self._groups[mask]
+
+    def top_k(self, subjects: Iterable[str], k: int) -> List[Tuple[str, float]]:
+        """
+        Хамгийн тохирох k mentor
+
+        Returns:
+            [(mentor_id, оноо)] буурахаар, тэнцвэл mentor_id-ээр
+        """
+        student = self._mask(subjects, grow=False)
+        heap = []
+        for mask, group in self._groups.items():
+            base = bin(mask & student).count("1") * SUBJECT_WEIGHT
+            neg_rating, mentor_id = group[0]
+            heap.append((neg_rating - base, mentor_id, base, mask, 0))
+        heapq.heapify(heap)
+
+        results = []
+        while heap and len(results) < k:
+            neg_score, mentor_id, base, mask, i = heapq.heappop(heap)
+            results.append((mentor_id, -neg_score))
+            group = self._groups[mask]
+            if i + 1 < len(group):
+                neg_rating, next_id = group[i + 1]
+                heapq.heappush(heap, (neg_rating - base, next_id, base, mask, i + 1))
+        return results
+
+    def rebuild(self, profiles: Iterable[Dict]):
+        """Бүх mentor-ийг дахин индексжүүлэх"""
+        fresh = MentorIndex()
+        for profile in profiles:
+            fresh.add(str(profile["_id"]), profile.get("subjects", []), profile.get("rating", 0.0))
+        self._subject_bits, self._groups, self._by_id = fresh._subject_bits, fresh._groups, fresh._by_id
+        self._loaded = True
+
+    async def refresh(self):
+        """mentor_profiles collection-оос индексийг шинэчлэх"""
+        cursor = get_mentor_profiles_collection().find({}, {"subjects": 1, "rating": 1})
+        self.rebuild(await cursor.to_list(length=None))
+        print(f"[OK] Mentor index loaded: {len(self)} mentors")
+
+    async def run_periodic_refresh(self, interval: int):
+        """Бусад worker-ийн өөрчлөлтийг тогтмол татах"""
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"[ERROR] Mentor index refresh failed: {e}")
+            await asyncio.sleep(interval)
+
+
+mentor_index = MentorIndex()
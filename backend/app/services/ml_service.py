@@ -1,112 +1,200 @@
-import os
-import joblib
+import asyncio
+import heapq
+import threading
 import numpy as np
-from typing import List, Dict, Any, Optional
+from collections import Counter
+from functools import lru_cache, partial
+from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
 
+from app.config import get_settings
 from app.models import WeekPlan
+from app.services.inference import BatchDispatcher
+from app.services.prediction_cache import PredictionCache
+from app.services.roadmap_table import roadmap_features
+from app.services.mentor_matching import mentor_score
+from app.services.features import (
+    DEFAULT_WEAKNESS_TOPIC_SCORE,
+    TOPICS,
+    FeatureMatrix,
+    extract_feature_matrix,
+    extract_features,
+)
+from app.services.model_registry import (
+    MODEL_FILES,
+    ModelSet,
+    ModelValidationError,
+    resolve_model_dir,
+)
+
+settings = get_settings()
 
 
 class MLService:
     """ML моделуудыг ачаалж, inference хийх service"""
     
-    def __init__(self):
-        self.models_path = Path(__file__).parent.parent.parent.parent / "ml" / "trained_models"
-        self.level_predictor = None
-        self.level_scaler = None
-        self.weakness_detector = None
-        self.topic_names = None
-        self.roadmap_generator = None
-        self.roadmap_scaler = None
-        
-        self._load_models()
-    
-    def _load_models(self):
-        """Сургагдсан моделуудыг ачаалах"""
-        try:
-            level_path = self.models_path / "level_predictor.joblib"
-            scaler_path = self.models_path / "level_scaler.joblib"
-            if level_path.exists() and scaler_path.exists():
-                self.level_predictor = joblib.load(level_path)
-                self.level_scaler = joblib.load(scaler_path)
-                print("[OK] Level predictor loaded")
-        except Exception as e:
-            print(f"[ERROR] Could not load level_predictor: {e}")
-        
-        try:
-            weakness_path = self.models_path / "weakness_detector.joblib"
-            topics_path = self.models_path / "topic_names.joblib"
-            if weakness_path.exists() and topics_path.exists():
-                self.weakness_detector = joblib.load(weakness_path)
-                self.topic_names = joblib.load(topics_path)
-                print("[OK] Weakness detector loaded")
-        except Exception as e:
-            print(f"[ERROR] Could not load weakness_detector: {e}")
-        
-        try:
-            roadmap_path = self.models_path / "roadmap_generator.joblib"
-            roadmap_scaler_path = self.models_path / "roadmap_scaler.joblib"
-            if roadmap_path.exists() and roadmap_scaler_path.exists():
-                self.roadmap_generator = joblib.load(roadmap_path)
-                self.roadmap_scaler = joblib.load(roadmap_scaler_path)
-                print("[OK] Roadmap generator loaded")
-        except Exception as e:
-            print(f"[ERROR] Could not load roadmap_generator: {e}")
+    def __init__(self, models_path: Optional[Path] = None, compiled_trees: Optional[bool] = None):
+        self.models_path = models_path or Path(__file__).parent.parent.parent.parent / "ml" / "trained_models"
+        self.compiled_trees = settings.inference_compiled_trees if compiled_trees is None else compiled_trees
+        self._current: Optional[ModelSet] = None
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self.prediction_cache = PredictionCache(
+            settings.prediction_cache_size, settings.prediction_cache_decimals
+        )
     
-    def predict_level(self, question_results: List[Dict]) -> int:
+    @property
+    def current(self) -> ModelSet:
+        """Идэвхтэй model set (анх хэрэглэх үед resolve хийнэ)"""
+        if self._current is None:
+            with self._lock:
+                if self._current is None:
+                    path, version = resolve_model_dir(self.models_path)
+                    candidate = ModelSet(path, version, self.compiled_trees)
+                    # Serve stale artifacts rather than nothing, but say so;
+                    # reload() refuses them outright
+                    for error in candidate.feature_version_errors():
+                        print(f"[ERROR] {path}: {error}")
+                    self._current = candidate
+        return self._current
+    
+    @property
+    def model_version(self) -> str:
+        return self.current.version
+    
+    def load_all(self):
+        """Бүх моделийг урьдчилан ачаалах"""
+        self.current.load_all()
+    
+    def warm_up(self):
+        """Моделиуд, compiled хувилбар, roadmap хүснэгтийг урьдчилан бэлдэх (blocking)"""
+        models = self.current
+        models.load_all()
+        for name in MODEL_FILES:
+            models.fast(name)
+        models.roadmap_table(settings.roadmap_table_max_weeks)
+    
+    def reload(self, force: bool = False) -> Dict[str, Any]:
         """
-        Сурагчийн түвшинг тодорхойлох
+        Шинэ хувилбарыг ачаалж, шалгаад солих
         
-        Args:
-            question_results: Асуултын хариултууд
+        The new set is fully loaded and validated before a single reference
+        assignment swaps it in; requests already holding the old set finish
+        on it. Blocking, run it off the event loop.
         
-        Returns:
-            Түвшин (1-10)
+        Raises:
+            ModelValidationError: Шинэ моделууд metadata-тай таарахгүй бол
         """
-        if not question_results:
-            return 5
-        
-        # Extract features
-        total = len(question_results)
-        correct = sum(1 for q in question_results if q.get("is_correct", False))
-        correct_ratio = correct / total if total > 0 else 0
-        
-        # Calculate average time
-        times = [q.get("time_taken", 60) for q in question_results]
-        avg_time = sum(times) / len(times) if times else 60
-        
-        # Hard questions (difficulty >= 3)
-        hard_qs = [q for q in question_results if q.get("difficulty", 1) >= 3]
-        hard_correct = sum(1 for q in hard_qs if q.get("is_correct", False))
-        hard_ratio = hard_correct / len(hard_qs) if hard_qs else 0
-        
-        # Topic scores
-        topic_scores = {
-            'algebra': 50, 'geometry': 50, 'trigonometry': 50,
-            'calculus': 50, 'probability': 50
-        }
-        
-        for topic in topic_scores:
-            topic_qs = [q for q in question_results if q.get("topic") == topic]
-            if topic_qs:
-                correct_in_topic = sum(1 for q in topic_qs if q.get("is_correct", False))
-                topic_scores[topic] = (correct_in_topic / len(topic_qs)) * 100
-        
-        if self.level_predictor is not None and self.level_scaler is not None:
-            features = np.array([[
-                correct_ratio,
-                avg_time,
-                hard_ratio,
-                topic_scores['algebra'],
-                topic_scores['geometry'],
-                topic_scores['trigonometry'],
-                topic_scores['calculus'],
-                topic_scores['probability']
-            ]])
-            features_scaled = self.level_scaler.transform(features)
-            level = self.level_predictor.predict(features_scaled)[0]
-            return int(level)
-        
+        with self._reload_lock:
+            path, version = resolve_model_dir(self.models_path)
+            previous = self._current.version if self._current is not None else None
+            if version == previous and not force:
+                return {"version": version, "previous_version": previous, "reloaded": False}
+            
+            candidate = ModelSet(path, version, self.compiled_trees)
+            candidate.load_all()
+            errors = candidate.validate()
+            if errors:
+                raise ModelValidationError("; ".join(errors))
+            # Build compiled evaluators and tables before the swap, not on the first request
+            for name in MODEL_FILES:
+                candidate.fast(name)
+            candidate.roadmap_table(settings.roadmap_table_max_weeks)
+            
+            self._current = candidate
+            self.prediction_cache.clear()
+            print(f"[OK] Models switched {previous} -> {version}")
+            return {"version": version, "previous_version": previous, "reloaded": True}
+    
+    async def reload_async(self, force: bool = False) -> Dict[str, Any]:
+        """reload-ийг worker thread дээр ажиллуулах"""
+        return await asyncio.get_running_loop().run_in_executor(None, self.reload, force)
+    
+    async def run_periodic_reload(self, interval: int):
+        """Идэвхтэй хувилбар өөрчлөгдөхийг ажиглаж, автоматаар солих"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.reload_async()
+            except ModelValidationError as e:
+                print(f"[ERROR] Model reload rejected: {e}")
+            except Exception as e:
+                print(f"[ERROR] Model reload failed: {e}")
+    
+    @property
+    def level_predictor(self):
+        return self.current.get("level_predictor")
+    
+    @property
+    def level_scaler(self):
+        return self.current.get("level_scaler")
+    
+    @property
+    def weakness_detector(self):
+        return self.current.get("weakness_detector")
+    
+    @property
+    def topic_names(self):
+        return self.current.get("topic_names")
+    
+    @property
+    def roadmap_generator(self):
+        return self.current.get("roadmap_generator")
+    
+    @property
+    def roadmap_scaler(self):
+        return self.current.get("roadmap_scaler")
+    
+    @staticmethod
+    def _dispatcher(models: ModelSet, name: str, predict) -> BatchDispatcher:
+        return models.dispatcher(
+            name,
+            partial(predict, models),
+            max_batch_size=settings.inference_max_batch_size,
+            max_wait=settings.inference_max_wait_ms / 1000,
+        )
+    
+    def _predict_cached(self, models: ModelSet, name: str, row: np.ndarray, predict):
+        """Нэг мөрийн таамаглал, cache-аас эсвэл моделиор"""
+        cache = self.prediction_cache
+        if not cache.enabled:
+            return predict(models, row[np.newaxis])[0]
+        row = cache.quantize(row)
+        key = cache.key(models.version, name, row)
+        hit, value = cache.get(key)
+        if not hit:
+            value = predict(models, row[np.newaxis])[0]
+            cache.put(key, value)
+        return value
+    
+    async def _predict_cached_async(self, models: ModelSet, name: str, row: np.ndarray, predict):
+        """_predict_cached-ийн async хувилбар: cache miss нь batch-аар ажиллана"""
+        cache = self.prediction_cache
+        if not cache.enabled:
+            return await self._dispatcher(models, name, predict).submit(row)
+        row = cache.quantize(row)
+        key = cache.key(models.version, name, row)
+        hit, value = cache.get(key)
+        if not hit:
+            value = await self._dispatcher(models, name, predict).submit(row)
+            cache.put(key, value)
+        return value
+    
+    @staticmethod
+    def _predict_level_batch(models: ModelSet, features: np.ndarray) -> np.ndarray:
+        features_scaled = models.fast("level_scaler").transform(features)
+        return models.fast("level_predictor").predict(features_scaled)
+    
+    @staticmethod
+    def _has_level_model(models: ModelSet) -> bool:
+        return models.get("level_predictor") is not None and models.get("level_scaler") is not None
+    
+    @staticmethod
+    def _has_weakness_model(models: ModelSet) -> bool:
+        return models.get("weakness_detector") is not None and models.get("topic_names") is not None
+    
+    @staticmethod
+    def _rule_based_level(correct_ratio: float) -> int:
         # Fallback: Simple rule-based
         score_pct = correct_ratio * 100
         
@@ -127,49 +215,65 @@ class MLService:
         else:
             return 2
     
-    def detect_weaknesses(
-        self, 
-        question_results: List[Dict], 
-        topics_wrong: List[str]
-    ) -> List[str]:
+    def predict_level(self, question_results: List[Dict]) -> int:
         """
-        Сул сэдвүүдийг олох
+        Сурагчийн түвшинг тодорхойлох
         
         Args:
             question_results: Асуултын хариултууд
-            topics_wrong: Буруу хариулсан сэдвүүд
         
         Returns:
-            Сул сэдвүүдийн жагсаалт
+            Түвшин (1-10)
         """
-        if self.weakness_detector is not None and self.topic_names is not None:
-            # Calculate score for each topic
-            topic_scores = {}
-            for topic in self.topic_names:
-                topic_qs = [q for q in question_results if q.get("topic") == topic]
-                if topic_qs:
-                    correct = sum(1 for q in topic_qs if q.get("is_correct", False))
-                    topic_scores[topic] = correct / len(topic_qs)
-                else:
-                    topic_scores[topic] = 0.5  # Default
-            
-            # Create feature array
-            features = np.array([[topic_scores.get(t, 0.5) for t in self.topic_names]])
-            
-            # Predict weakest topic
-            weakest_idx = self.weakness_detector.predict(features)[0]
-            
-            # Get all topics with score < 0.5
-            weak_topics = [t for t, s in topic_scores.items() if s < 0.5]
-            
-            # Make sure the predicted weakest is included
-            if self.topic_names[weakest_idx] not in weak_topics:
-                weak_topics.insert(0, self.topic_names[weakest_idx])
-            
-            return weak_topics[:3]  # Return top 3 weak topics
+        if not question_results:
+            return 5
         
+        models = self.current
+        features = extract_features(question_results)
+        if self._has_level_model(models):
+            return int(self._predict_cached(models, "level", features.level[0], self._predict_level_batch))
+        return self._rule_based_level(features.correct_ratio[0])
+    
+    async def predict_level_async(self, question_results: List[Dict]) -> int:
+        """predict_level-ийн async хувилбар: зэрэг хүсэлтүүдийг batch-аар ажиллуулна"""
+        if not question_results:
+            return 5
+        return await self._predict_level_async(self.current, extract_features(question_results))
+    
+    async def _predict_level_async(self, models: ModelSet, features: FeatureMatrix) -> int:
+        if self._has_level_model(models):
+            level = await self._predict_cached_async(models, "level", features.level[0], self._predict_level_batch)
+            return int(level)
+        return self._rule_based_level(features.correct_ratio[0])
+    
+    @staticmethod
+    def _weakness_scores(models: ModelSet, features: FeatureMatrix) -> Dict[str, float]:
+        # Score for each topic in the order the detector was trained on
+        row = features.weakness[0]
+        return {
+            topic: float(row[TOPICS.index(topic)]) if topic in TOPICS else DEFAULT_WEAKNESS_TOPIC_SCORE
+            for topic in models.get("topic_names")
+        }
+    
+    @staticmethod
+    def _predict_weakest_batch(models: ModelSet, features: np.ndarray) -> np.ndarray:
+        return models.fast("weakness_detector").predict(features)
+    
+    @staticmethod
+    def _weak_topics(models: ModelSet, topic_scores: Dict[str, float], weakest_idx: int) -> List[str]:
+        topic_names = models.get("topic_names")
+        # Get all topics with score < 0.5
+        weak_topics = [t for t, s in topic_scores.items() if s < 0.5]
+        
+        # Make sure the predicted weakest is included
+        if topic_names[weakest_idx] not in weak_topics:
+            weak_topics.insert(0, topic_names[weakest_idx])
+        
+        return weak_topics[:3]  # Return top 3 weak topics
+    
+    @staticmethod
+    def _fallback_weaknesses(topics_wrong: List[str]) -> List[str]:
         # Fallback: Count topics
-        from collections import Counter
         topic_counts = Counter(topics_wrong)
         
         # Return topics with >= 2 wrong answers
@@ -181,6 +285,120 @@ class MLService:
         
         return weak_topics
     
+    def detect_weaknesses(
+        self, 
+        question_results: List[Dict], 
+        topics_wrong: List[str]
+    ) -> List[str]:
+        """
+        Сул сэдвүүдийг олох
+        
+        Args:
+            question_results: Асуултын хариултууд
+            topics_wrong: Буруу хариулсан сэдвүүд
+        
+        Returns:
+            Сул сэдвүүдийн жагсаалт
+        """
+        models = self.current
+        if self._has_weakness_model(models):
+            topic_scores = self._weakness_scores(models, extract_features(question_results))
+            row = np.array(list(topic_scores.values()))
+            weakest_idx = self._predict_cached(models, "weakness", row, self._predict_weakest_batch)
+            return self._weak_topics(models, topic_scores, weakest_idx)
+        
+        return self._fallback_weaknesses(topics_wrong)
+    
+    async def detect_weaknesses_async(
+        self, 
+        question_results: List[Dict], 
+        topics_wrong: List[str]
+    ) -> List[str]:
+        """detect_weaknesses-ийн async хувилбар: зэрэг хүсэлтүүдийг batch-аар ажиллуулна"""
+        return await self._detect_weaknesses_async(self.current, extract_features(question_results), topics_wrong)
+    
+    async def _detect_weaknesses_async(
+        self, models: ModelSet, features: FeatureMatrix, topics_wrong: List[str]
+    ) -> List[str]:
+        if self._has_weakness_model(models):
+            topic_scores = self._weakness_scores(models, features)
+            row = np.array(list(topic_scores.values()))
+            weakest_idx = await self._predict_cached_async(models, "weakness", row, self._predict_weakest_batch)
+            return self._weak_topics(models, topic_scores, weakest_idx)
+        
+        return self._fallback_weaknesses(topics_wrong)
+    
+    async def assess(
+        self,
+        question_results: List[Dict],
+        topics_wrong: List[str],
+        predict_level: bool = True
+    ) -> Tuple[int, List[str], str]:
+        """
+        Түвшин ба сул сэдвийг нэг feature дамжилтаар тодорхойлох
+        
+        Args:
+            predict_level: False бол зөвхөн сул сэдвийг тодорхойлно (түвшин 5)
+        
+        Returns:
+            (түвшин, сул сэдвүүд, үнэлсэн моделийн хувилбар)
+        """
+        # Pin one model set so a concurrent reload cannot mix versions
+        models = self.current
+        features = extract_features(question_results)
+        if not question_results or not predict_level:
+            return 5, await self._detect_weaknesses_async(models, features, topics_wrong), models.version
+        level, weak_topics = await asyncio.gather(
+            self._predict_level_async(models, features),
+            self._detect_weaknesses_async(models, features, topics_wrong),
+        )
+        return level, weak_topics, models.version
+    
+    def assess_batch(
+        self,
+        sessions: List[List[Dict]],
+        topics_wrong: List[List[str]]
+    ) -> Tuple[List[int], List[List[str]], str]:
+        """
+        Олон session-ийг нэг дор үнэлэх (offline rescoring)
+        
+        Same results as assess() per session, but features are extracted and
+        each model runs once for the whole batch, bypassing cache and dispatcher.
+        
+        Returns:
+            (түвшнүүд, сул сэдвүүд, моделийн хувилбар)
+        """
+        models = self.current
+        matrix = extract_feature_matrix(sessions)
+        if len(matrix) == 0:
+            return [], [], models.version
+        # Round like the online cache does so both paths agree
+        cache = self.prediction_cache
+        model_input = cache.quantize if cache.enabled else np.asarray
+        
+        if self._has_level_model(models):
+            levels = [int(level) for level in self._predict_level_batch(models, model_input(matrix.level))]
+        else:
+            levels = [self._rule_based_level(ratio) for ratio in matrix.correct_ratio]
+        levels = [level if results else 5 for level, results in zip(levels, sessions)]
+        
+        if not self._has_weakness_model(models):
+            return levels, [self._fallback_weaknesses(wrong) for wrong in topics_wrong], models.version
+        
+        topic_names = list(models.get("topic_names"))
+        columns = [
+            matrix.weakness[:, TOPICS.index(topic)] if topic in TOPICS
+            else np.full(len(matrix), DEFAULT_WEAKNESS_TOPIC_SCORE)
+            for topic in topic_names
+        ]
+        scores = np.column_stack(columns)
+        weakest = self._predict_weakest_batch(models, model_input(scores))
+        weak_topics = [
+            self._weak_topics(models, dict(zip(topic_names, row.tolist())), idx)
+            for row, idx in zip(scores, weakest)
+        ]
+        return levels, weak_topics, models.version
+    
     def generate_roadmap(
         self, 
         level: int, 
@@ -203,33 +421,20 @@ class MLService:
         # Predict recommended hours if model available
         recommended_hours = 10  # Default
         
-        if self.roadmap_generator is not None and self.roadmap_scaler is not None:
-            target_level = min(10, level + 3)
-            topics = self.topic_names if self.topic_names else ['algebra', 'geometry', 'trigonometry', 'calculus', 'probability', 'sequences', 'functions', 'vectors']
-            
-            # Create feature with topic scores (assume 0.5 for all)
-            features_dict = {
-                'current_level': level,
-                'target_level': target_level,
-                'weeks_available': weeks_available
-            }
-            for topic in topics:
-                features_dict[f'{topic}_score'] = 0.5
-            
-            # Mark weak topics with lower scores
-            for weak in weak_topics:
-                if f'{weak}_score' in features_dict:
-                    features_dict[f'{weak}_score'] = 0.3
-            
-            features = np.array([[
-                features_dict['current_level'],
-                features_dict['target_level'],
-                features_dict['weeks_available']
-            ] + [features_dict.get(f'{t}_score', 0.5) for t in topics]])
-            
+        models = self.current
+        if models.get("roadmap_generator") is not None and models.get("roadmap_scaler") is not None:
             try:
-                features_scaled = self.roadmap_scaler.transform(features)
-                recommended_hours = max(5, min(40, self.roadmap_generator.predict(features_scaled)[0]))
+                hours = None
+                table = models.roadmap_table(settings.roadmap_table_max_weeks)
+                if table is not None:
+                    hours = table.lookup(level, weeks_available, weak_topics)
+                if hours is None:
+                    # Out-of-grid input: ask the model directly
+                    topics = list(models.get("topic_names") if models.get("topic_names") else TOPICS)
+                    features = np.array([roadmap_features(level, weeks_available, topics, weak_topics)])
+                    features_scaled = models.fast("roadmap_scaler").transform(features)
+                    hours = models.fast("roadmap_generator").predict(features_scaled)[0]
+                recommended_hours = max(5, min(40, hours))
             except:
                 pass
         
@@ -283,7 +488,8 @@ class MLService:
     def match_mentor(
         self, 
         student_profile: Dict, 
-        mentor_profiles: List[Dict]
+        mentor_profiles: List[Dict],
+        k: Optional[int] = None
     ) -> List[Dict]:
         """
         Тохирох mentor олох
@@ -291,24 +497,22 @@ class MLService:
         Args:
             student_profile: Сурагчийн мэдээлэл
             mentor_profiles: Mentor-уудын мэдээлэл
+            k: Хэдэн mentor буцаах (None бол бүгд)
         
         Returns:
             Эрэмбэлсэн mentor жагсаалт
         """
-        if self.mentor_matcher is not None:
-            # TODO: ML-based matching
-            pass
-        
-        # Fallback: Simple matching by subjects
+        # Same scoring as the /api/mentoring/match index, over an ad-hoc list
         student_subjects = set(student_profile.get("subjects", []))
-        
-        scored_mentors = []
-        for mentor in mentor_profiles:
-            mentor_subjects = set(mentor.get("subjects", []))
-            overlap = len(student_subjects & mentor_subjects)
-            score = overlap * 10 + mentor.get("rating", 0)
-            scored_mentors.append((score, mentor))
-        
-        scored_mentors.sort(key=lambda x: x[0], reverse=True)
-        
-        return [m for _, m in scored_mentors]
+        scored = (
+            (mentor_score(len(student_subjects & set(m.get("subjects", []))), m.get("rating", 0)), -i)
+            for i, m in enumerate(mentor_profiles)
+        )
+        top = heapq.nlargest(len(mentor_profiles) if k is None else k, scored)
+        return [mentor_profiles[-i] for _, i in top]
+
+
+@lru_cache()
+def get_ml_service() -> MLService:
+    """Process даяар нэг MLService instance"""
+    return MLService()
@@ -0,0 +1,100 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+import bcrypt
+
+from app.config import get_settings
+
+settings = get_settings()
+
+
+def _normalize_password(password: str) -> bytes:
+    # bcrypt has a 72-byte limit; truncate to preserve legacy behavior.
+    password_bytes = password.encode("utf-8")
+    return password_bytes[:72] if len(password_bytes) > 72 else password_bytes
+
+
+def hash_password(password: str) -> str:
+    hashed = bcrypt.hashpw(_normalize_password(password), bcrypt.gensalt())
+    return hashed.decode("utf-8")
+
+
+def check_password(plain_password: str, hashed_password: str) -> bool:
+    if not hashed_password:
+        return False
+    try:
+        hashed_bytes = (
+            hashed_password.encode("utf-8")
+            if isinstance(hashed_password, str)
+            else hashed_password
+        )
+        return bcrypt.checkpw(_normalize_password(plain_password), hashed_bytes)
+    except ValueError:
+        return False
+
+
+class PasswordHasher:
+    """
+    bcrypt-ийг event loop-оос гадуур, хязгаартай thread pool дээр ажиллуулах
+
+    bcrypt releases the GIL while hashing, so threads give real parallelism
+    and the loop keeps serving other requests. At most max_workers hashes
+    run at once; further callers wait on the semaphore, and that wait is
+    what queue_depth and the wait-time stats report.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.total_wait_seconds = 0.0
+        self.total_run_seconds = 0.0
+
+    async def _run(self, func: Callable[..., Any], *args) -> Any:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+        queued_at = time.perf_counter()
+        self.queue_depth += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queue_depth -= 1
+        started = time.perf_counter()
+        self.total_wait_seconds += started - queued_at
+        self.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self.total_run_seconds += time.perf_counter() - started
+            self._semaphore.release()
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        if not hashed_password:
+            return False
+        return await self._run(check_password, plain_password, hashed_password)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_workers": self.max_workers,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "avg_wait_ms": self.total_wait_seconds / self.completed * 1000 if self.completed else 0.0,
+            "avg_run_ms": self.total_run_seconds / self.completed * 1000 if self.completed else 0.0,
+        }
+
+
+password_hasher = PasswordHasher(settings.password_hash_workers)
@@ -0,0 +1,69 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+
+class PredictionCache:
+    """
+    Feature вектороор түлхүүрлэсэн LRU prediction cache
+
+    Rows are rounded to `decimals` before both lookup and prediction, so a
+    cached value is always exactly what the model returns for the key.
+    Keys include the model version; MLService clears the cache on reload.
+    """
+
+    def __init__(self, max_size: int, decimals: int):
+        self.max_size = max_size
+        self.decimals = decimals
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def quantize(self, row: np.ndarray) -> np.ndarray:
+        # + 0.0 folds -0.0 into 0.0 so both hash the same
+        return np.round(np.asarray(row, dtype=np.float64), self.decimals) + 0.0
+
+    @staticmethod
+    def key(version: str, name: str, row: np.ndarray) -> Tuple[str, str, bytes]:
+        return version, name, row.tobytes()
+
+    def get(self, key: Hashable) -> Tuple[bool, Optional[Any]]:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key: Hashable, value: Any):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,175 @@
+import asyncio
+import csv
+import hashlib
+import json
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple
+
+from pydantic import ValidationError
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.db import get_questions_collection
+from app.models import QuestionBase
+from app.services.seen_questions import reserve_ordinals
+
+DEFAULT_CHUNK_SIZE = 1000
+
+# Only the first errors are returned in full so the report stays bounded
+MAX_REPORTED_ERRORS = 100
+
+# CSV columns holding lists: JSON array or "|"-separated values
+CSV_LIST_COLUMNS = ("options", "tags")
+
+
+def content_hash(question: QuestionBase) -> str:
+    """Асуултын агуулгаас тогтвортой hash үүсгэх (давхардлыг илрүүлэх)"""
+    key = json.dumps(
+        [question.subject, question.topic, question.content, question.options],
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def detect_format(filename: Optional[str]) -> str:
+    if filename and filename.lower().endswith(".csv"):
+        return "csv"
+    return "ndjson"
+
+
+def _csv_row(row: Dict[str, str]) -> dict:
+    data = {k: v for k, v in row.items() if k and v not in (None, "")}
+    for column in CSV_LIST_COLUMNS:
+        value = data.get(column)
+        if value is None:
+            continue
+        value = value.strip()
+        data[column] = json.loads(value) if value.startswith("[") else value.split("|")
+    return data
+
+
+def parse_rows(stream: TextIO, fmt: str) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """
+    Файлаас мөр мөрөөр унших
+
+    Yields:
+        (мөрийн дугаар, өгөгдөл, алдаа) - алдаатай бол өгөгдөл нь None
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            try:
+                yield reader.line_num, _csv_row(row), None
+            except ValueError as e:
+                yield reader.line_num, None, str(e)
+        return
+
+    for line_no, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as e:
+            yield line_no, None, str(e)
+            continue
+        if not isinstance(data, dict):
+            yield line_no, None, "Expected a JSON object"
+            continue
+        yield line_no, data, None
+
+
+class ImportReport:
+    def __init__(self):
+        self.rows = 0
+        self.inserted = 0
+        self.updated = 0
+        self.error_count = 0
+        self.errors: List[dict] = []
+
+    def add_error(self, row: int, error: str):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "error": error})
+
+    def to_dict(self) -> dict:
+        return {
+            "rows": self.rows,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "error_count": self.error_count,
+            "errors": self.errors,
+        }
+
+
+def _validate_chunk(
+    rows: List[Tuple[int, Optional[dict], Optional[str]]],
+    report: ImportReport,
+) -> Tuple[List[dict], List[int]]:
+    docs = []
+    line_numbers = []
+    for line_no, data, error in rows:
+        report.rows += 1
+        if error is not None:
+            report.add_error(line_no, error)
+            continue
+        try:
+            question = QuestionBase.model_validate(data)
+        except ValidationError as e:
+            report.add_error(line_no, "; ".join(
+                f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()
+            ))
+            continue
+        doc = question.model_dump()
+        doc["content_hash"] = content_hash(question)
+        docs.append(doc)
+        line_numbers.append(line_no)
+    return docs, line_numbers
+
+
+async def import_questions(
+    stream: TextIO,
+    fmt: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> dict:
+    """
+    NDJSON/CSV асуултын файлыг chunk-аар уншиж, content hash-аар upsert хийх
+
+    Санах ойн хэрэглээ нь файлын хэмжээнээс үл хамааран chunk_size-аар хязгаарлагдана.
+    """
+    questions_col = get_questions_collection()
+    report = ImportReport()
+    rows = parse_rows(stream, fmt)
+
+    while True:
+        # Parsing and validation are CPU-bound; keep them off the event loop
+        chunk = await asyncio.to_thread(lambda: list(islice(rows, chunk_size)))
+        if not chunk:
+            break
+        docs, line_numbers = await asyncio.to_thread(_validate_chunk, chunk, report)
+        if not docs:
+            continue
+
+        # Ordinals reserved for rows that turn out to be updates are simply skipped
+        first_ordinal = await reserve_ordinals(len(docs))
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {"content_hash": doc["content_hash"]},
+                {"$set": doc, "$setOnInsert": {"created_at": now, "ordinal": first_ordinal + i}},
+                upsert=True,
+            )
+            for i, doc in enumerate(docs)
+        ]
+        try:
+            result = await questions_col.bulk_write(operations, ordered=False)
+            details = result.bulk_api_result
+        except BulkWriteError as e:
+            details = e.details
+            for err in details.get("writeErrors", []):
+                report.add_error(line_numbers[err["index"]], err.get("errmsg", "Write error"))
+        report.inserted += details.get("nUpserted", 0)
+        report.updated += details.get("nModified", 0)
+
+    return report.to_dict()
@@ -0,0 +1,211 @@
+import asyncio
+import random
+import time
+from array import array
+from itertools import product
+from typing import Container, Dict, List, Optional, Tuple
+
+from app.config import get_settings
+from app.db import get_questions_collection
+from app.models import QuestionInTest
+
+settings = get_settings()
+
+# Topic MN mapping
+TOPIC_MN_MAP = {
+    "algebra": "Алгебр",
+    "geometry": "Геометр",
+    "trigonometry": "Тригонометр",
+    "calculus": "Анализ",
+    "probability": "Магадлал",
+    "sequences": "Дараалал",
+    "functions": "Функц",
+    "vectors": "Вектор"
+}
+
+POOL_PROJECTION = {
+    "subject": 1,
+    "topic": 1,
+    "topic_mn": 1,
+    "difficulty": 1,
+    "content": 1,
+    "question": 1,
+    "options": 1,
+    "correct_answer": 1,
+    "explanation": 1,
+    "time_limit": 1,
+    "ordinal": 1,
+    "irt_a": 1,
+    "irt_b": 1,
+    "irt_c": 1,
+}
+
+PoolKey = Tuple[Optional[str], Optional[str], Optional[int]]
+
+
+def build_question_in_test(q: dict) -> QuestionInTest:
+    """Mongo document-оос QuestionInTest үүсгэх"""
+    return QuestionInTest(
+        id=str(q["_id"]),
+        subject=q.get("subject", "Математик"),
+        topic=q.get("topic", ""),
+        topic_mn=TOPIC_MN_MAP.get(q.get("topic", ""), q.get("topic_mn", "")),
+        difficulty=q.get("difficulty", 2),
+        content=q.get("content", q.get("question", "")),
+        options=q.get("options", []),
+        correct_answer=q.get("correct_answer"),
+        explanation=q.get("explanation", ""),
+        time_limit=q.get("time_limit", 60)
+    )
+
+
+class QuestionPool:
+    """Асуултын санг process дотор хадгалж, $sample-гүйгээр санамсаргүй сонгох"""
+
+    def __init__(self, max_age_seconds: int):
+        self.max_age_seconds = max_age_seconds
+        # (subject, topic, difficulty) -> ordinals / payloads; None means "any"
+        self._ordinals: Dict[PoolKey, array] = {}
+        self._payloads: Dict[PoolKey, List[QuestionInTest]] = {}
+        # question id -> calibrated (a, b, c) item parameters, when present
+        self._irt_params: Dict[str, Tuple[float, float, float]] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    @property
+    def is_warm(self) -> bool:
+        return (
+            self._loaded_at is not None
+            and time.monotonic() - self._loaded_at <= self.max_age_seconds
+        )
+
+    async def refresh(self):
+        """Асуултын санг Mongo-оос дахин ачаалах"""
+        async with self._lock:
+            questions_col = get_questions_collection()
+            ordinals: Dict[PoolKey, array] = {}
+            payloads: Dict[PoolKey, List[QuestionInTest]] = {}
+            irt_params: Dict[str, Tuple[float, float, float]] = {}
+
+            async for q in questions_col.find({}, POOL_PROJECTION):
+                payload = build_question_in_test(q)
+                subject = q.get("subject")
+                topic = q.get("topic")
+                difficulty = q.get("difficulty")
+                # Index every wildcard combination so sampling never scans
+                for key in product((subject, None), (topic, None), (difficulty, None)):
+                    ordinals.setdefault(key, array("q")).append(q.get("ordinal", -1))
+                    payloads.setdefault(key, []).append(payload)
+                if q.get("irt_b") is not None:
+                    irt_params[payload.id] = (
+                        float(q.get("irt_a", 1.0)),
+                        float(q["irt_b"]),
+                        float(q.get("irt_c", 0.0)),
+                    )
+
+            self._ordinals = ordinals
+            self._payloads = payloads
+            self._irt_params = irt_params
+            self._loaded_at = time.monotonic()
+
+    @property
+    def loaded_at(self) -> Optional[float]:
+        return self._loaded_at
+
+    def questions(
+        self,
+        subject: Optional[str] = None,
+        topic: Optional[str] = None,
+        difficulty: Optional[int] = None,
+    ) -> List[QuestionInTest]:
+        """Шүүлтүүрт тохирох бүх асуулт (pool ачаалагдсан байх ёстой)"""
+        return self._payloads.get((subject, topic, difficulty), [])
+
+    def irt_params(self, question_id: str) -> Optional[Tuple[float, float, float]]:
+        """Калибровласан IRT параметрүүд (a, b, c), байхгүй бол None"""
+        return self._irt_params.get(question_id)
+
+    def invalidate(self):
+        """Асуултын сан өөрчлөгдсөн үед дуудна"""
+        self._loaded_at = None
+        self._schedule_refresh()
+
+    def _schedule_refresh(self):
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_safely())
+
+    async def _refresh_safely(self):
+        try:
+            await self.refresh()
+        except Exception as e:
+            print(f"[ERROR] Could not refresh question pool: {e}")
+
+    def sample(
+        self,
+        count: int,
+        subject: Optional[str] = None,
+        topic: Optional[str] = None,
+        difficulty: Optional[int] = None,
+        exclude: Optional[Container[int]] = None,
+    ) -> Optional[List[QuestionInTest]]:
+        """
+        Санамсаргүй асуулт сонгох
+
+        Args:
+            exclude: Хэрэглэгчийн үзсэн асуултуудын ordinal (SeenSet)
+
+        Returns:
+            Асуултууд, эсвэл pool хүйтэн/хуучирсан бол None (Mongo руу fallback)
+        """
+        if not self.is_warm:
+            self._schedule_refresh()
+            return None
+
+        key = (subject, topic, difficulty)
+        payloads = self._payloads.get(key, [])
+        if len(payloads) <= count:
+            return random.sample(payloads, len(payloads))
+        if not exclude:
+            return random.sample(payloads, count)
+        return self._sample_unseen(payloads, self._ordinals[key], count, exclude)
+
+    @staticmethod
+    def _sample_unseen(
+        payloads: List[QuestionInTest],
+        ordinals: array,
+        count: int,
+        exclude: Container[int],
+    ) -> List[QuestionInTest]:
+        # Rejection sampling stays O(count) while most of the bucket is unseen
+        n = len(payloads)
+        chosen: List[int] = []
+        tried = set()
+        for _ in range(count * 4):
+            i = random.randrange(n)
+            if i in tried:
+                continue
+            tried.add(i)
+            if ordinals[i] not in exclude:
+                chosen.append(i)
+                if len(chosen) == count:
+                    return [payloads[i] for i in chosen]
+
+        # Mostly seen bucket: scan once, then top up with seen questions
+        unseen = [i for i in range(n) if ordinals[i] not in exclude]
+        chosen = random.sample(unseen, min(count, len(unseen)))
+        if len(chosen) < count:
+            taken = set(chosen)
+            rest = [i for i in range(n) if i not in taken]
+            chosen += random.sample(rest, count - len(chosen))
+        return [payloads[i] for i in chosen]
+
+    async def run_periodic_refresh(self):
+        """Pool-г хуучрахаас өмнө тогтмол шинэчлэх"""
+        interval = max(1, self.max_age_seconds // 2)
+        while True:
+            await self._refresh_safely()
+            await asyncio.sleep(interval)
+
+
+question_pool = QuestionPool(settings.question_pool_max_age_seconds)
@@ -0,0 +1,67 @@
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+LEVELS = range(1, 11)
+WEAK_TOPIC_SCORE = 0.3
+DEFAULT_TOPIC_SCORE = 0.5
+# 2 ** 10 masks per (level, weeks) cell is still small; beyond that, skip the table
+MAX_TABLE_TOPICS = 10
+
+
+def roadmap_features(level: int, weeks_available: int, topics: List[str], weak_topics: Iterable[str]) -> List[float]:
+    """Roadmap моделийн feature мөр: одоогийн/зорилтот түвшин, долоо хоног, сэдвийн оноо"""
+    weak = set(weak_topics)
+    target_level = min(10, level + 3)
+    return [level, target_level, weeks_available] + [
+        WEAK_TOPIC_SCORE if topic in weak else DEFAULT_TOPIC_SCORE for topic in topics
+    ]
+
+
+class RoadmapTable:
+    """
+    Roadmap-ийн долоо хоногийн цагийг урьдчилан тооцсон хүснэгт
+
+    Indexed by level (1-10), weeks available (1..max_weeks) and a bit mask
+    of weak topics in model topic order. Every cell holds the raw model
+    output for that input, computed in one batch at build time.
+    """
+
+    def __init__(self, topics: List[str], max_weeks: int, hours: np.ndarray):
+        self.topics = topics
+        self.max_weeks = max_weeks
+        self.hours = hours
+        self._bits = {topic: 1 << i for i, topic in enumerate(topics)}
+
+    @classmethod
+    def build(cls, scaler, generator, topics: List[str], max_weeks: int, chunk_size: int = 8192) -> Optional["RoadmapTable"]:
+        if len(topics) > MAX_TABLE_TOPICS or max_weeks < 1:
+            return None
+        n_masks = 1 << len(topics)
+        level, weeks, mask = np.meshgrid(
+            np.arange(1, 11), np.arange(1, max_weeks + 1), np.arange(n_masks), indexing="ij"
+        )
+        level, weeks, mask = level.ravel(), weeks.ravel(), mask.ravel()
+        is_weak = (mask[:, None] >> np.arange(len(topics))) & 1
+        X = np.column_stack([
+            level,
+            np.minimum(10, level + 3),
+            weeks,
+            np.where(is_weak == 1, WEAK_TOPIC_SCORE, DEFAULT_TOPIC_SCORE),
+        ]).astype(np.float64)
+
+        hours = np.empty(len(X))
+        for start in range(0, len(X), chunk_size):
+            chunk = X[start:start + chunk_size]
+            hours[start:start + chunk_size] = generator.predict(scaler.transform(chunk))
+        return cls(topics, max_weeks, hours.reshape(len(LEVELS), max_weeks, n_masks))
+
+    def lookup(self, level: int, weeks_available: int, weak_topics: Iterable[str]) -> Optional[float]:
+        """Хүснэгтээс цаг авах; хүснэгтэд байхгүй оролт бол None"""
+        # range membership also rejects non-integral values
+        if level not in LEVELS or weeks_available not in range(1, self.max_weeks + 1):
+            return None
+        mask = 0
+        for topic in weak_topics:
+            mask |= self._bits.get(topic, 0)
+        return float(self.hours[int(level) - 1, int(weeks_available) - 1, mask])
@@ -0,0 +1,95 @@
+from typing import Dict, Iterable
+
+from bson.int64 import Int64
+from pymongo import ReturnDocument, UpdateOne
+
+from app.db import get_counters_collection, get_questions_collection, get_question_seen_collection
+
+ORDINAL_COUNTER = "question_ordinal"
+WORD_BITS = 64
+
+
+async def reserve_ordinals(n: int) -> int:
+    """n ширхэг дараалсан ordinal нөөцлөх; эхний ordinal-ыг буцаана"""
+    counter = await get_counters_collection().find_one_and_update(
+        {"_id": ORDINAL_COUNTER},
+        {"$inc": {"value": n}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    return counter["value"] - n
+
+
+async def assign_missing_ordinals(batch_size: int = 1000) -> int:
+    """ordinal-гүй асуултуудад ordinal олгох (idempotent)"""
+    questions_col = get_questions_collection()
+    assigned = 0
+    while True:
+        docs = await questions_col.find(
+            {"ordinal": {"$exists": False}}, {"_id": 1}
+        ).limit(batch_size).to_list(length=batch_size)
+        if not docs:
+            return assigned
+        first = await reserve_ordinals(len(docs))
+        await questions_col.bulk_write([
+            UpdateOne(
+                {"_id": doc["_id"], "ordinal": {"$exists": False}},
+                {"$set": {"ordinal": first + i}},
+            )
+            for i, doc in enumerate(docs)
+        ], ordered=False)
+        assigned += len(docs)
+
+
+class SeenSet:
+    """
+    Хэрэглэгчийн үзсэн асуултуудын bitmap
+
+    Mongo-д {"w": {"<word index>": Int64}} хэлбэрээр зөвхөн 0 биш 64-bit
+    үгсийг хадгалдаг тул хэмжээ нь үзсэн асуултын тоотой пропорциональ.
+    """
+
+    def __init__(self, words: Dict[int, int] = None):
+        self.words = words or {}
+
+    def __contains__(self, ordinal: int) -> bool:
+        if ordinal < 0:
+            return False
+        return bool((self.words.get(ordinal // WORD_BITS, 0) >> (ordinal % WORD_BITS)) & 1)
+
+    def __bool__(self) -> bool:
+        return bool(self.words)
+
+    @classmethod
+    def from_doc(cls, doc: dict) -> "SeenSet":
+        return cls({int(k): int(v) for k, v in (doc or {}).get("w", {}).items()})
+
+
+def _bit_update(ordinals: Iterable[int]) -> dict:
+    masks: Dict[int, int] = {}
+    for ordinal in ordinals:
+        if ordinal is None or ordinal < 0:
+            continue
+        word = ordinal // WORD_BITS
+        masks[word] = masks.get(word, 0) | (1 << (ordinal % WORD_BITS))
+    # Int64 is signed: map the top bit onto the negative range
+    return {
+        f"w.{word}": {"or": Int64(mask - (1 << 64) if mask >= 1 << 63 else mask)}
+        for word, mask in masks.items()
+    }
+
+
+async def load_seen(user_id: str) -> SeenSet:
+    doc = await get_question_seen_collection().find_one({"_id": user_id}, {"w": 1})
+    return SeenSet.from_doc(doc)
+
+
+async def mark_seen(user_id: str, ordinals: Iterable[int]):
+    """Үзсэн асуултуудыг атомар $bit OR-оор нэмэх (нэг round-trip)"""
+    update = _bit_update(ordinals)
+    if update:
+        await get_question_seen_collection().update_one(
+            {"_id": user_id},
+            {"$bit": update},
+            upsert=True,
+        )
@@ -0,0 +1,195 @@
+import asyncio
+import os
+import time
+from collections import Counter
+from pathlib import Path
+from typing import List, Optional
+
+from bson import ObjectId, json_util
+from pymongo.errors import BulkWriteError, PyMongoError
+
+from app.config import get_settings
+from app.db import get_test_sessions_collection
+
+settings = get_settings()
+
+DUPLICATE_KEY_ERROR = 11000
+# Queued by flush_user() to close the batch being collected
+_FLUSH_NOW = object()
+
+
+class SessionWriter:
+    """
+    test_sessions-ийн write-behind буфер
+
+    Идэвхтэй үед write() шууд _id буцааж, session-уудыг insert_many-аар
+    багцлан бичнэ. Mongo бэлэн биш бол багцыг локал spill файлд хадгалж,
+    дараагийн эхлэлд дахин бичнэ.
+
+    Readers of a user's own sessions call flush_user() first: it closes
+    the batch being collected and waits until that user's queued sessions
+    have been written, so a just-submitted test shows up in history and
+    roadmap. Sessions that had to be spilled stay invisible until replay.
+    """
+
+    def __init__(
+        self,
+        enabled: bool,
+        batch_size: int,
+        flush_interval: float,
+        spill_path: Path,
+    ):
+        self.enabled = enabled
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spill_path = spill_path
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        # user_id -> sessions queued but not yet flushed
+        self._pending: Counter = Counter()
+        self._flushed: Optional[asyncio.Condition] = None
+
+    async def start(self):
+        """Spill файлыг дахин бичиж, flush loop эхлүүлэх"""
+        if not self.enabled:
+            return
+        await self.replay_spill()
+        self._queue = asyncio.Queue(maxsize=self.batch_size * 50)
+        self._flushed = asyncio.Condition()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Дараалалд байгаа бүх session-ийг flush хийж зогсоох"""
+        if self._task is None:
+            return
+        # Sentinel goes behind every queued session, so _run drains them first
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    async def write(self, session: dict) -> ObjectId:
+        """Session хадгалах; write-behind идэвхтэй бол дараалалд оруулна"""
+        session.setdefault("_id", ObjectId())
+        # A dead flush loop would never drain the queue; write directly
+        if self._task is None or self._task.done():
+            await get_test_sessions_collection().insert_one(session)
+        else:
+            self._pending[session.get("user_id")] += 1
+            await self._queue.put(session)
+        return session["_id"]
+
+    async def flush_user(self, user_id, timeout: float = 5.0):
+        """Хэрэглэгчийн дараалалд байгаа session-уудыг бичигдтэл хүлээх"""
+        if not self._pending.get(user_id) or self._task is None or self._task.done():
+            return
+        # The marker sits behind the user's sessions, so whichever batch
+        # reaches it already holds them and is flushed right away
+        await self._queue.put(_FLUSH_NOW)
+        async with self._flushed:
+            try:
+                await asyncio.wait_for(
+                    self._flushed.wait_for(lambda: not self._pending.get(user_id)),
+                    timeout,
+                )
+            except asyncio.TimeoutError:
+                print(f"[ERROR] Test sessions of {user_id} not flushed within {timeout}s")
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            session = await self._queue.get()
+            if session is None:
+                break
+            if session is _FLUSH_NOW:
+                continue
+            batch = [session]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    session = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if session is None:
+                    stopping = True
+                    break
+                if session is _FLUSH_NOW:
+                    break
+                batch.append(session)
+            try:
+                await self._flush(batch)
+            except Exception as e:
+                # Never let one bad batch end the loop (write() would block on a full queue)
+                print(f"[ERROR] Flushing {len(batch)} test sessions failed: {e!r}")
+                try:
+                    await self._spill(batch)
+                except Exception as spill_error:
+                    print(f"[ERROR] Could not spill {len(batch)} test sessions, they are lost: {spill_error!r}")
+            await self._mark_flushed(batch)
+
+    async def _mark_flushed(self, batch: List[dict]):
+        for session in batch:
+            user_id = session.get("user_id")
+            self._pending[user_id] -= 1
+            if self._pending[user_id] <= 0:
+                del self._pending[user_id]
+        async with self._flushed:
+            self._flushed.notify_all()
+
+    async def _flush(self, batch: List[dict]):
+        try:
+            await get_test_sessions_collection().insert_many(batch, ordered=False)
+        except BulkWriteError as e:
+            # Duplicates were already written (e.g. replayed spill); keep the rest
+            failed = {
+                err["index"] for err in e.details.get("writeErrors", [])
+                if err.get("code") != DUPLICATE_KEY_ERROR
+            }
+            if failed:
+                await self._spill([batch[i] for i in sorted(failed)])
+        except PyMongoError as e:
+            print(f"[ERROR] Could not write test sessions, spilling {len(batch)}: {e}")
+            await self._spill(batch)
+
+    async def _spill(self, batch: List[dict]):
+        await asyncio.to_thread(self._append_spill, batch)
+
+    def _append_spill(self, batch: List[dict]):
+        self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+        with self.spill_path.open("a", encoding="utf-8") as f:
+            for session in batch:
+                f.write(json_util.dumps(session) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    async def replay_spill(self):
+        """Өмнө нь Mongo руу бичиж чадаагүй session-уудыг дахин бичих"""
+        replay_path = self.spill_path.with_suffix(".replay")
+        # A leftover replay file means the previous replay was interrupted
+        if not replay_path.exists():
+            if not self.spill_path.exists():
+                return
+            os.replace(self.spill_path, replay_path)
+
+        batch = []
+        with replay_path.open("r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    batch.append(json_util.loads(line))
+                if len(batch) >= self.batch_size:
+                    await self._flush(batch)
+                    batch = []
+        if batch:
+            await self._flush(batch)
+        replay_path.unlink()
+        print(f"[OK] Replayed spilled test sessions from {self.spill_path}")
+
+
+session_writer = SessionWriter(
+    enabled=settings.session_write_behind,
+    batch_size=settings.session_write_batch_size,
+    flush_interval=settings.session_write_flush_ms / 1000,
+    spill_path=Path(settings.session_spill_path),
+)
@@ -0,0 +1,109 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Dict, Tuple
+
+from app.db import get_revoked_tokens_collection
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+class RevocationList:
+    """
+    Хүчингүй болгосон token-уудын санах ойн жагсаалт
+
+    Two kinds of entries, both mirrored in the revoked_tokens collection:
+        jti        one token (a used refresh token, a logged-out session)
+        not_before every access token of a user issued before this time
+                   (role or active flag changed)
+    Entries are only kept until the tokens they cover would have expired,
+    so the set stays small; a TTL index removes them from Mongo as well.
+    Checks are pure memory lookups. Local revocations apply immediately;
+    other workers see them on their next refresh().
+    """
+
+    def __init__(self):
+        self._jtis: Dict[str, float] = {}
+        # user_id -> (not_before, expires_at)
+        self._not_before: Dict[str, Tuple[float, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._jtis) + len(self._not_before)
+
+    def is_revoked(self, claims: Dict) -> bool:
+        if claims.get("jti") in self._jtis:
+            return True
+        if claims.get("type", "access") == "access":
+            entry = self._not_before.get(claims.get("sub"))
+            if entry is not None and claims.get("iat", 0) < entry[0]:
+                return True
+        return False
+
+    async def revoke_token(self, jti: str, user_id: str, expires_at: float) -> bool:
+        """
+        Нэг token-ийг (jti) хүчингүй болгох
+
+        Returns False if it was already revoked (by any worker).
+        """
+        self._jtis[jti] = expires_at
+        result = await get_revoked_tokens_collection().update_one(
+            {"jti": jti},
+            {"$setOnInsert": {
+                "jti": jti,
+                "user_id": user_id,
+                "expires_at": datetime.utcfromtimestamp(expires_at),
+            }},
+            upsert=True,
+        )
+        return result.upserted_id is not None
+
+    async def revoke_user_access(self, user_id: str, lifetime_seconds: float):
+        """Хэрэглэгчийн одоо байгаа бүх access token-ийг хүчингүй болгох"""
+        now = time.time()
+        self._not_before[user_id] = (now, now + lifetime_seconds)
+        await get_revoked_tokens_collection().update_one(
+            {"user_id": user_id, "not_before": {"$exists": True}},
+            {"$set": {
+                "not_before": now,
+                "expires_at": datetime.utcfromtimestamp(now + lifetime_seconds),
+            }},
+            upsert=True,
+        )
+
+    async def refresh(self):
+        """revoked_tokens collection-оос шинэ entry татаж, хугацаа дууссаныг хаях"""
+        loaded_jtis: Dict[str, float] = {}
+        loaded_users: Dict[str, Tuple[float, float]] = {}
+        cursor = get_revoked_tokens_collection().find(
+            {"expires_at": {"$gt": datetime.utcnow()}},
+            {"jti": 1, "user_id": 1, "not_before": 1, "expires_at": 1},
+        )
+        async for doc in cursor:
+            expires_at = (doc["expires_at"] - _EPOCH).total_seconds()
+            if doc.get("jti"):
+                loaded_jtis[doc["jti"]] = expires_at
+            elif doc.get("not_before") is not None:
+                loaded_users[doc["user_id"]] = (doc["not_before"], expires_at)
+
+        # Merge rather than replace: a revocation made locally while the
+        # query ran must not be lost, and revocations never shrink early
+        now = time.time()
+        jtis = {**self._jtis, **loaded_jtis}
+        self._jtis = {jti: exp for jti, exp in jtis.items() if exp > now}
+        users = dict(self._not_before)
+        for user_id, entry in loaded_users.items():
+            if user_id not in users or entry[0] > users[user_id][0]:
+                users[user_id] = entry
+        self._not_before = {u: entry for u, entry in users.items() if entry[1] > now}
+
+    async def run_periodic_refresh(self, interval: int):
+        """Бусад worker-ийн хүчингүй болголтыг тогтмол татах"""
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"[ERROR] Token revocation refresh failed: {e}")
+            await asyncio.sleep(interval)
+
+
+revocation_list = RevocationList()
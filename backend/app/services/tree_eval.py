@@ -0,0 +1,153 @@
+"""
+Compiled evaluators for the fitted sklearn models served by MLService
+
+Tree ensembles are flattened into contiguous node arrays (feature,
+threshold, children, leaf values) and every tree is traversed at once with
+NumPy fancy indexing, skipping sklearn's per-call validation overhead.
+Inputs are rounded through float32 exactly as sklearn's trees do, and leaf
+values are accumulated tree by tree in estimator order, so predictions
+match sklearn bit for bit.
+"""
+
+import numpy as np
+from typing import List
+
+try:
+    from sklearn.ensemble import GradientBoostingRegressor, RandomForestClassifier
+    from sklearn.preprocessing import StandardScaler
+except ImportError:  # pragma: no cover - sklearn is required to unpickle the models anyway
+    GradientBoostingRegressor = RandomForestClassifier = StandardScaler = None
+
+TREE_LEAF = -1
+# Above this many rows sklearn's own (multi-threaded) predict is faster;
+# outputs are identical either way
+SKLEARN_MIN_ROWS = 512
+
+
+class FlatTrees:
+    """Олон модыг нэг массив болгон хавтгайруулсан бүтэц"""
+
+    def __init__(self, trees: List, value_scale: float = 1.0):
+        offsets = np.cumsum([0] + [t.node_count for t in trees])
+        self.roots = offsets[:-1].astype(np.intp)
+
+        left = []
+        right = []
+        for tree, offset in zip(trees, offsets[:-1]):
+            is_leaf = tree.children_left == TREE_LEAF
+            own = np.arange(tree.node_count) + offset
+            # Leaves point at themselves, so traversal can run a fixed number of steps
+            left.append(np.where(is_leaf, own, tree.children_left + offset))
+            right.append(np.where(is_leaf, own, tree.children_right + offset))
+
+        self.left = np.concatenate(left).astype(np.intp)
+        self.right = np.concatenate(right).astype(np.intp)
+        self.feature = np.concatenate([np.maximum(t.feature, 0) for t in trees]).astype(np.intp)
+        self.threshold = np.concatenate([t.threshold for t in trees])
+        # (n_nodes, n_outputs) leaf payloads, pre-multiplied the way sklearn does
+        values = np.concatenate([t.value[:, 0, :] for t in trees])
+        self.value = values * value_scale if value_scale != 1.0 else values
+        self.depth = max(t.max_depth for t in trees)
+
+    def leaf_values(self, X: np.ndarray) -> np.ndarray:
+        """
+        Returns:
+            (n_samples, n_trees, n_outputs) мод бүрийн навчны утга
+        """
+        # sklearn trees evaluate on float32 inputs
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        rows = np.arange(X.shape[0])[:, None]
+        node = np.broadcast_to(self.roots, (X.shape[0], len(self.roots)))
+        for _ in range(self.depth):
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+        return self.value[node]
+
+
+class CompiledForestClassifier:
+    """RandomForestClassifier-ийн хурдан хувилбар"""
+
+    def __init__(self, model):
+        self.model = model
+        self.classes_ = model.classes_
+        self.n_features_in_ = model.n_features_in_
+        self.n_estimators = len(model.estimators_)
+        self.trees = FlatTrees([e.tree_ for e in model.estimators_])
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        if len(X) >= SKLEARN_MIN_ROWS:
+            return self.model.predict_proba(X)
+        leaves = self.trees.leaf_values(X)
+        # Sequential sum in estimator order, like sklearn's single-job accumulation
+        proba = np.cumsum(leaves, axis=1)[:, -1, :]
+        return proba / self.n_estimators
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        if len(X) >= SKLEARN_MIN_ROWS:
+            return self.model.predict(X)
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
+
+
+class CompiledGradientBoostingRegressor:
+    """GradientBoostingRegressor-ийн хурдан хувилбар (single output)"""
+
+    def __init__(self, model):
+        self.model = model
+        self.n_features_in_ = model.n_features_in_
+        if model.init_ == "zero":
+            self.init = 0.0
+        else:
+            self.init = float(model.init_.predict(np.zeros((1, model.n_features_in_)))[0])
+        self.trees = FlatTrees(
+            [e.tree_ for e in model.estimators_[:, 0]],
+            value_scale=model.learning_rate,
+        )
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        if len(X) >= SKLEARN_MIN_ROWS:
+            return self.model.predict(X)
+        leaves = self.trees.leaf_values(X)[:, :, 0]
+        raw = np.empty((leaves.shape[0], leaves.shape[1] + 1))
+        raw[:, 0] = self.init
+        raw[:, 1:] = leaves
+        # Stage-by-stage accumulation, matching sklearn's predict_stages
+        return np.cumsum(raw, axis=1)[:, -1]
+
+
+class CompiledStandardScaler:
+    """StandardScaler.transform-ийг validation-гүйгээр гүйцэтгэх"""
+
+    def __init__(self, model):
+        self.mean_ = model.mean_
+        self.scale_ = model.scale_
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        X = np.array(X, dtype=np.float64)
+        X -= self.mean_
+        X /= self.scale_
+        return X
+
+
+def compile_model(model):
+    """
+    Дэмжигдсэн моделийг compile хийх
+
+    Returns:
+        Compiled модель, эсвэл дэмжигдэхгүй бол None (sklearn-ээр үргэлжилнэ)
+    """
+    if model is None or RandomForestClassifier is None:
+        return None
+    try:
+        if type(model) is RandomForestClassifier and model.n_outputs_ == 1:
+            return CompiledForestClassifier(model)
+        if (
+            type(model) is GradientBoostingRegressor
+            and model.estimators_.shape[1] == 1
+            and model.loss == "squared_error"
+        ):
+            return CompiledGradientBoostingRegressor(model)
+        if type(model) is StandardScaler and model.with_mean and model.with_std:
+            return CompiledStandardScaler(model)
+    except Exception as e:
+        print(f"[ERROR] Could not compile {type(model).__name__}: {e}")
+    return None
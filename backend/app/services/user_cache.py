@@ -0,0 +1,87 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.config import get_settings
+
+settings = get_settings()
+
+
+class UserCache:
+    """
+    JWT `sub`-ээр түлхүүрлэсэн, TTL ба хэмжээгээр хязгаарласан хэрэглэгчийн cache
+
+    get_current_user fills it on the first lookup of a user, so hot users
+    cost no database round trip. Endpoints that modify a user document call
+    invalidate(); the TTL bounds how stale other workers can be, since each
+    process keeps its own cache. Callers get a copy, never the cached dict.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl_seconds > 0
+
+    def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                expires_at, user = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(user_id)
+                    self.hits += 1
+                    return copy.deepcopy(user)
+                del self._entries[user_id]
+                self.expirations += 1
+            self.misses += 1
+            return None
+
+    def put(self, user_id: str, user: Dict[str, Any]):
+        if not self.enabled:
+            return
+        entry = (time.monotonic() + self.ttl_seconds, copy.deepcopy(user))
+        with self._lock:
+            self._entries[user_id] = entry
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, user_id: str):
+        with self._lock:
+            if self._entries.pop(str(user_id), None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+user_cache = UserCache(settings.user_cache_size, settings.user_cache_ttl_seconds)
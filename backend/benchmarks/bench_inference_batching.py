@@ -0,0 +1,80 @@
+"""
+EYSH - Inference micro-batching benchmark
+predict_level-ийг шууд дуудах ба BatchDispatcher-аар дамжуулах харьцуулалт
+
+Usage (from backend/):
+    python -m benchmarks.bench_inference_batching
+    python -m benchmarks.bench_inference_batching --models-path /path/to/trained_models
+
+For 1, 50 and 500 concurrent submitters, each issuing --requests calls in
+total, reports throughput and p50/p99 latency of the direct (blocking)
+path and of predict_level_async.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from pathlib import Path
+
+from app.services.ml_service import MLService
+from benchmarks.synthetic import synthetic_session
+
+
+def synthetic_results(n_questions: int = 20):
+    # The random module itself serves as the generator, so random.seed() applies
+    return synthetic_session(random, n_questions)
+
+
+async def run(service: MLService, mode: str, concurrency: int, total: int):
+    latencies = []
+    per_worker = max(1, total // concurrency)
+
+    async def worker():
+        for _ in range(per_worker):
+            results = synthetic_results()
+            start = time.perf_counter()
+            if mode == "direct":
+                service.predict_level(results)
+                await asyncio.sleep(0)
+            else:
+                await service.predict_level_async(results)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2],
+        "p99_ms": latencies[max(0, int(len(latencies) * 0.99) - 1)],
+    }
+
+
+async def main_async(args):
+    service = MLService(args.models_path)
+    service.load_all()
+    if service.level_predictor is None:
+        raise SystemExit(f"No level predictor found in {service.models_path}")
+    # Warm up sklearn and the thread pool
+    service.predict_level(synthetic_results())
+    await service.predict_level_async(synthetic_results())
+
+    print(f"{'concurrency':<12}{'mode':<10}{'req/s':>10}{'p50 (ms)':>10}{'p99 (ms)':>10}")
+    for concurrency in (1, 50, 500):
+        for mode in ("direct", "batched"):
+            r = await run(service, mode, concurrency, args.requests)
+            print(f"{concurrency:<12}{mode:<10}{r['throughput']:>10.0f}{r['p50_ms']:>10.2f}{r['p99_ms']:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inference micro-batching benchmark")
+    parser.add_argument("--models-path", type=Path, default=None)
+    parser.add_argument("--requests", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
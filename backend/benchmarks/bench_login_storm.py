@@ -0,0 +1,162 @@
+"""
+EYSH - Login storm benchmark
+Олон зэрэг login хийх үед бусад endpoint-ийн latency хэр өөрчлөгдөхийг хэмжих
+
+Usage (from backend/):
+    python -m benchmarks.bench_login_storm
+    python -m benchmarks.bench_login_storm --logins 200 --concurrency 50
+    python -m benchmarks.bench_login_storm --url http://localhost:8000 --email admin@eysh.mn --password admin123
+
+Default (in-process, no MongoDB): runs the storm of bcrypt verifications
+twice on one event loop, first inline as the handlers used to, then through
+password_hasher, while a probe coroutine measures how late the loop serves
+a 10 ms timer. The probe stands in for any unrelated request.
+
+With --url: fires real POST /api/auth/login requests at a running backend
+from a thread pool while one thread polls GET /health, and reports /health
+latency before and during the storm.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import threading
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from app.services.password_hasher import PasswordHasher, check_password, hash_password
+
+PROBE_INTERVAL = 0.01
+
+
+def percentiles(samples):
+    if not samples:
+        return {"p50": None, "p95": None, "p99": None, "max": None}
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {
+        "p50": round(statistics.median(ordered) * 1000, 2),
+        "p95": round(pick(0.95) * 1000, 2),
+        "p99": round(pick(0.99) * 1000, 2),
+        "max": round(ordered[-1] * 1000, 2),
+    }
+
+
+# ---- in-process ----------------------------------------------------------
+
+async def _probe(stop: asyncio.Event, lags):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(time.perf_counter() - start - PROBE_INTERVAL)
+
+
+async def _storm(verify, hashed: str, logins: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def login():
+        async with semaphore:
+            assert await verify("password123", hashed)
+
+    lags = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_probe(stop, lags))
+    await asyncio.sleep(PROBE_INTERVAL * 5)
+    baseline = len(lags)
+    start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe
+    return elapsed, lags[:baseline], lags[baseline:]
+
+
+async def run_in_process(logins: int, concurrency: int, workers: int):
+    hashed = hash_password("password123")
+
+    async def inline(plain, hashed_password):
+        return check_password(plain, hashed_password)
+
+    hasher = PasswordHasher(workers)
+    report = {"logins": logins, "concurrency": concurrency, "workers": workers}
+    for name, verify in (("inline", inline), ("pooled", hasher.verify)):
+        elapsed, idle, storm = await _storm(verify, hashed, logins, concurrency)
+        report[name] = {
+            "seconds": round(elapsed, 2),
+            "logins_per_sec": round(logins / elapsed, 1),
+            "loop_lag_idle_ms": percentiles(idle),
+            "loop_lag_storm_ms": percentiles(storm),
+            "probes_during_storm": len(storm),
+        }
+    report["pooled"]["hasher"] = hasher.stats()
+    return report
+
+
+# ---- against a running backend ------------------------------------------
+
+def run_http(url: str, email: str, password: str, logins: int, concurrency: int):
+    body = urllib.parse.urlencode({"username": email, "password": password}).encode()
+
+    def login(_):
+        request = urllib.request.Request(f"{url}/api/auth/login", data=body, method="POST")
+        request.add_header("Content-Type", "application/x-www-form-urlencoded")
+        with urllib.request.urlopen(request) as response:
+            return response.status
+
+    def health():
+        start = time.perf_counter()
+        with urllib.request.urlopen(f"{url}/health") as response:
+            response.read()
+        return time.perf_counter() - start
+
+    idle = [health() for _ in range(50)]
+
+    storm, stop = [], threading.Event()
+
+    def poll():
+        while not stop.is_set():
+            storm.append(health())
+            time.sleep(PROBE_INTERVAL)
+
+    poller = threading.Thread(target=poll)
+    poller.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        statuses = list(pool.map(login, range(logins)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    poller.join()
+
+    return {
+        "logins": logins,
+        "concurrency": concurrency,
+        "ok": statuses.count(200),
+        "seconds": round(elapsed, 2),
+        "logins_per_sec": round(logins / elapsed, 1),
+        "health_idle_ms": percentiles(idle),
+        "health_storm_ms": percentiles(storm),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Login storm vs. unrelated request latency")
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=4, help="bcrypt threads (in-process mode)")
+    parser.add_argument("--url", default=None, help="Base URL of a running backend")
+    parser.add_argument("--email", default="admin@eysh.mn")
+    parser.add_argument("--password", default="admin123")
+    args = parser.parse_args()
+
+    if args.url:
+        report = run_http(args.url.rstrip("/"), args.email, args.password, args.logins, args.concurrency)
+    else:
+        report = asyncio.run(run_in_process(args.logins, args.concurrency, args.workers))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+EYSH - Mentor matching benchmark
+MentorIndex.top_k ба бүх mentor-ийг эрэмбэлэх аргын харьцуулалт
+
+Usage (from backend/):
+    python -m benchmarks.bench_mentor_match
+    python -m benchmarks.bench_mentor_match --mentors 100000 --k 10
+
+Builds an index over synthetic mentor profiles, checks that top_k returns
+the same ranking as scoring and sorting every mentor, and reports build
+time, per-insert cost and per-query latency for both.
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from app.services.mentor_matching import MentorIndex, mentor_score
+
+SUBJECTS = ['math', 'physics', 'chemistry', 'biology', 'mongolian', 'english', 'history', 'geography', 'social', 'informatics']
+
+
+def synthetic_mentors(n: int):
+    return [
+        {
+            "_id": f"{i:024x}",
+            "subjects": random.sample(SUBJECTS, random.randint(1, 3)),
+            "rating": round(random.uniform(0, 5), 1),
+        }
+        for i in range(n)
+    ]
+
+
+def brute_force(mentors, subjects, k):
+    wanted = set(subjects)
+    scored = [(mentor_score(len(wanted & set(m["subjects"])), m["rating"]), m["_id"]) for m in mentors]
+    scored.sort(key=lambda x: (-x[0], x[1]))
+    return [(mentor_id, score) for score, mentor_id in scored[:k]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mentor matching benchmark")
+    parser.add_argument("--mentors", type=int, default=100_000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=1000)
+    args = parser.parse_args()
+
+    random.seed(0)
+    mentors = synthetic_mentors(args.mentors)
+    index = MentorIndex()
+    start = time.perf_counter()
+    index.rebuild(mentors)
+    build_s = time.perf_counter() - start
+
+    queries = [random.sample(SUBJECTS, random.randint(0, 4)) for _ in range(args.queries)]
+    ok = all(index.top_k(q, args.k) == brute_force(mentors, q, args.k) for q in queries[:20])
+
+    start = time.perf_counter()
+    for q in queries:
+        index.top_k(q, args.k)
+    index_us = (time.perf_counter() - start) / len(queries) * 1e6
+
+    start = time.perf_counter()
+    for q in queries[:20]:
+        brute_force(mentors, q, args.k)
+    brute_us = (time.perf_counter() - start) / 20 * 1e6
+
+    start = time.perf_counter()
+    for m in synthetic_mentors(1000):
+        index.add("f" + m["_id"], m["subjects"], m["rating"])
+    add_us = (time.perf_counter() - start) / 1000 * 1e6
+
+    print(f"mentors          {args.mentors:,}")
+    print(f"build            {build_s:.2f} s")
+    print(f"add              {add_us:.1f} us")
+    print(f"top-{args.k} (index)   {index_us:.1f} us")
+    print(f"top-{args.k} (sort)    {brute_us:.1f} us")
+    print(f"parity           {'identical' if ok else 'MISMATCH'}")
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
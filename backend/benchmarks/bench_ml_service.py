@@ -0,0 +1,213 @@
+"""
+EYSH - MLService benchmark suite
+predict_level, detect_weaknesses, generate_roadmap-ийн latency ба throughput
+
+Usage (from backend/):
+    python -m benchmarks.bench_ml_service --output bench.json
+    python -m benchmarks.bench_ml_service --models-path /path/to/trained_models
+    python -m benchmarks.bench_ml_service --profile predict_level
+    python -m benchmarks.bench_ml_service --profile assess_batch --profiler pyinstrument
+
+Every case runs on the same seeded synthetic sessions (benchmarks.synthetic)
+and reports p50/p95/p99 latency per call plus rows/second. Results are
+written as JSON with the commit, library versions and model version, so
+two runs can be diffed. The prediction cache is off unless --cache is
+given, so numbers reflect the model path.
+
+--profile NAME captures one case with cProfile (prints the top functions
+and writes NAME.prof) or with pyinstrument if installed and requested.
+"""
+
+import argparse
+import asyncio
+import cProfile
+import json
+import platform
+import pstats
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+import sklearn
+
+from app.services.ml_service import MLService
+from benchmarks.synthetic import synthetic_sessions, topics_wrong
+
+
+def summarize(latencies: List[float], rows: int, elapsed: float) -> Dict:
+    ms = np.asarray(latencies) * 1000
+    return {
+        "calls": len(latencies),
+        "rows": rows,
+        "p50_ms": round(float(np.percentile(ms, 50)), 4),
+        "p95_ms": round(float(np.percentile(ms, 95)), 4),
+        "p99_ms": round(float(np.percentile(ms, 99)), 4),
+        "rows_per_s": round(rows / elapsed, 1),
+    }
+
+
+def time_calls(fn: Callable[[int], int], calls: int) -> Dict:
+    """fn(i) нь боловсруулсан мөрийн тоог буцаана"""
+    fn(0)  # warm-up
+    latencies = []
+    rows = 0
+    start = time.perf_counter()
+    for i in range(calls):
+        t = time.perf_counter()
+        rows += fn(i)
+        latencies.append(time.perf_counter() - t)
+    return summarize(latencies, rows, time.perf_counter() - start)
+
+
+async def time_concurrent(service: MLService, sessions, concurrency: int, calls: int) -> Dict:
+    latencies = []
+    per_worker = max(1, calls // concurrency)
+
+    wrong = [topics_wrong(r) for r in sessions]
+
+    async def worker(offset: int):
+        for i in range(per_worker):
+            index = (offset * per_worker + i) % len(sessions)
+            t = time.perf_counter()
+            await service.assess(sessions[index], wrong[index])
+            latencies.append(time.perf_counter() - t)
+
+    await service.assess(sessions[0], topics_wrong(sessions[0]))
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(w) for w in range(concurrency)))
+    return summarize(latencies, len(latencies), time.perf_counter() - start)
+
+
+def build_cases(service: MLService, sessions, batch_sizes: List[int]) -> Dict[str, Callable[[int], int]]:
+    n = len(sessions)
+    wrong = [topics_wrong(r) for r in sessions]
+
+    def predict_level(i):
+        service.predict_level(sessions[i % n])
+        return 1
+
+    def detect_weaknesses(i):
+        service.detect_weaknesses(sessions[i % n], wrong[i % n])
+        return 1
+
+    def generate_roadmap(i):
+        service.generate_roadmap(1 + i % 10, wrong[i % n][:3])
+        return 1
+
+    cases = {
+        "predict_level": predict_level,
+        "detect_weaknesses": detect_weaknesses,
+        "generate_roadmap": generate_roadmap,
+    }
+    # Inputs are prepared once so slicing is the only per-call overhead
+    doubled_sessions = sessions + sessions
+    doubled_wrong = wrong + wrong
+    for size in batch_sizes:
+        def assess_batch(i, size=size):
+            start = (i * size) % n
+            chunk = doubled_sessions[start:start + size]
+            service.assess_batch(chunk, doubled_wrong[start:start + size])
+            return len(chunk)
+        cases[f"assess_batch_{size}"] = assess_batch
+    return cases
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def profile(name: str, fn: Callable[[int], int], calls: int, profiler: str):
+    if profiler == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            raise SystemExit("pyinstrument is not installed (pip install pyinstrument)")
+        p = Profiler()
+        p.start()
+        for i in range(calls):
+            fn(i)
+        p.stop()
+        print(p.output_text(unicode=True, color=False))
+        return
+
+    p = cProfile.Profile()
+    p.enable()
+    for i in range(calls):
+        fn(i)
+    p.disable()
+    p.dump_stats(f"{name}.prof")
+    pstats.Stats(p).sort_stats("cumulative").print_stats(20)
+    print(f"Profile written to {name}.prof")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MLService benchmark suite")
+    parser.add_argument("--models-path", type=Path, default=None)
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--batch-sizes", type=int, nargs="*", default=[64, 1024])
+    parser.add_argument("--concurrency", type=int, nargs="*", default=[1, 50])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--cache", action="store_true", help="Keep the prediction cache on")
+    parser.add_argument("--output", type=Path, default=None, help="Write JSON here instead of stdout")
+    parser.add_argument("--profile", default=None, help="Profile one case instead of benchmarking")
+    parser.add_argument("--profiler", choices=["cprofile", "pyinstrument"], default="cprofile")
+    args = parser.parse_args()
+
+    service = MLService(args.models_path)
+    service.load_all()
+    if not args.cache:
+        service.prediction_cache.max_size = 0
+    sessions = synthetic_sessions(args.sessions, seed=args.seed)
+    cases = build_cases(service, sessions, args.batch_sizes)
+
+    if args.profile:
+        if args.profile not in cases:
+            raise SystemExit(f"Unknown case {args.profile}; choose from {', '.join(cases)}")
+        profile(args.profile, cases[args.profile], args.calls, args.profiler)
+        return
+
+    results = {}
+    for name, fn in cases.items():
+        calls = args.calls if not name.startswith("assess_batch") else max(5, args.calls // 50)
+        results[name] = time_calls(fn, calls)
+        print(f"{name:<24}{results[name]['p50_ms']:>10.3f} ms p50{results[name]['rows_per_s']:>14,.0f} rows/s", file=sys.stderr)
+    for concurrency in args.concurrency:
+        name = f"assess_async_c{concurrency}"
+        results[name] = asyncio.run(time_concurrent(service, sessions, concurrency, args.calls))
+        print(f"{name:<24}{results[name]['p50_ms']:>10.3f} ms p50{results[name]['rows_per_s']:>14,.0f} rows/s", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "sklearn": sklearn.__version__,
+            "model_version": service.model_version,
+            "compiled_trees": service.compiled_trees,
+            "prediction_cache": args.cache,
+            "seed": args.seed,
+            "sessions": args.sessions,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+        print(f"Results written to {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
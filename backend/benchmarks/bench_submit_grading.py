@@ -0,0 +1,121 @@
+"""
+EYSH - Submit grading benchmark
+/api/tests/submit-ийн хариу шалгах хэсгийн round-trip, latency хэмжилт
+
+Usage (from backend/):
+    python -m benchmarks.bench_submit_grading --answers 50 --repeat 200
+
+Requires a running MongoDB (settings.mongodb_url). Uses a scratch database
+that is dropped afterwards.
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from bson import ObjectId
+from pymongo import MongoClient, monitoring
+
+from app.config import get_settings
+
+TOPICS = ['algebra', 'geometry', 'trigonometry', 'calculus', 'probability']
+
+
+class CommandCounter(monitoring.CommandListener):
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        if event.command_name in ("find", "getMore"):
+            self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def grade_per_answer(questions_col, answers):
+    """Хуучин арга: хариулт бүрт find_one"""
+    correct = 0
+    for answer in answers:
+        question = questions_col.find_one({"_id": ObjectId(answer["question_id"])})
+        if question and question["correct_answer"] == answer["answer"]:
+            correct += 1
+    return correct
+
+
+def grade_batched(questions_col, answers):
+    """Шинэ арга: нэг $in query, санах ойд шалгах"""
+    oids = list({ObjectId(a["question_id"]) for a in answers})
+    docs = questions_col.find({"_id": {"$in": oids}}, {"correct_answer": 1, "topic": 1})
+    by_id = {str(q["_id"]): q for q in docs}
+    correct = 0
+    for answer in answers:
+        question = by_id.get(answer["question_id"])
+        if question and question["correct_answer"] == answer["answer"]:
+            correct += 1
+    return correct
+
+
+def run(grade, questions_col, answers, counter, repeat):
+    latencies = []
+    counter.count = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        grade(questions_col, answers)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return {
+        "round_trips": counter.count / repeat,
+        "p50_ms": statistics.median(latencies),
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--answers", type=int, default=50)
+    parser.add_argument("--bank", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    settings = get_settings()
+    counter = CommandCounter()
+    client = MongoClient(settings.mongodb_url, event_listeners=[counter])
+    db = client[f"{settings.database_name}_bench"]
+    questions_col = db["questions"]
+
+    try:
+        questions_col.insert_many([
+            {
+                "subject": "Математик",
+                "topic": random.choice(TOPICS),
+                "difficulty": random.randint(1, 5),
+                "content": f"Question {i}",
+                "options": ["A", "B", "C", "D"],
+                "correct_answer": random.randint(0, 3),
+            }
+            for i in range(args.bank)
+        ])
+        ids = [str(q["_id"]) for q in questions_col.find({}, {"_id": 1})]
+        answers = [
+            {"question_id": qid, "answer": random.randint(0, 3), "time_spent": 30}
+            for qid in random.sample(ids, args.answers)
+        ]
+
+        before = run(grade_per_answer, questions_col, answers, counter, args.repeat)
+        after = run(grade_batched, questions_col, answers, counter, args.repeat)
+
+        print(f"{'':<12}{'round-trips':>12}{'p50 (ms)':>12}{'p99 (ms)':>12}")
+        for name, r in (("per-answer", before), ("batched", after)):
+            print(f"{name:<12}{r['round_trips']:>12.1f}{r['p50_ms']:>12.3f}{r['p99_ms']:>12.3f}")
+    finally:
+        client.drop_database(db.name)
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
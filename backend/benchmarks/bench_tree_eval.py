@@ -0,0 +1,66 @@
+"""
+EYSH - Compiled tree evaluator benchmark
+sklearn predict ба tree_eval-ийн хурдны харьцуулалт
+
+Usage (from backend/):
+    python -m benchmarks.bench_tree_eval
+    python -m benchmarks.bench_tree_eval --models-path /path/to/trained_models
+
+Latency: single-row predict through sklearn and through the compiled
+evaluator, and MLService.predict_level with the evaluator on and off.
+Bit-for-bit parity with sklearn is covered by tests/test_tree_eval.py.
+"""
+
+import argparse
+import random
+import time
+from pathlib import Path
+
+from app.services.features import extract_feature_matrix
+from app.services.ml_service import MLService
+from app.services.tree_eval import compile_model
+from benchmarks.bench_inference_batching import synthetic_results
+
+
+def per_call_us(fn, repeat: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compiled tree evaluator benchmark")
+    parser.add_argument("--models-path", type=Path, default=None)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    service = MLService(args.models_path)
+    service.load_all()
+    if service.level_predictor is None:
+        raise SystemExit(f"No level predictor found in {service.models_path}")
+
+    random.seed(0)
+    matrix = extract_feature_matrix(synthetic_results(random.randint(5, 40)) for _ in range(100))
+    level_X = service.level_scaler.transform(matrix.level)
+    weakness_X = matrix.weakness
+
+    print(f"{'single-row predict':<20}{'sklearn (us)':>14}{'compiled (us)':>15}")
+    for name, X in (("level_predictor", level_X), ("weakness_detector", weakness_X)):
+        model = getattr(service, name)
+        compiled = compile_model(model)
+        row = X[:1]
+        print(f"{name:<20}{per_call_us(lambda: model.predict(row), args.repeat):>14.1f}"
+              f"{per_call_us(lambda: compiled.predict(row), args.repeat):>15.1f}")
+
+    results = synthetic_results()
+    sklearn_service = MLService(service.models_path, compiled_trees=False)
+    # Measure the model path, not prediction cache hits
+    service.prediction_cache.max_size = sklearn_service.prediction_cache.max_size = 0
+    print(f"{'predict_level':<20}{per_call_us(lambda: sklearn_service.predict_level(results), args.repeat):>14.1f}"
+          f"{per_call_us(lambda: service.predict_level(results), args.repeat):>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Synthetic question_results for benchmarks
+
+Sessions are drawn so their features follow the distributions
+ml/notebooks/train_models.py trains on: overall accuracy U(0.1, 1),
+average answer time U(20, 180) s and per-topic accuracy U(0, 1).
+Seeded generators make runs reproducible.
+"""
+
+import random
+from typing import Dict, List, Optional
+
+from app.services.features import TOPICS
+
+
+def synthetic_session(rng: random.Random, n_questions: Optional[int] = None) -> List[Dict]:
+    """Нэг session-ий question_results"""
+    n = n_questions if n_questions is not None else rng.randint(10, 40)
+    correct_ratio = rng.uniform(0.1, 1.0)
+    avg_time = rng.uniform(20, 180)
+    # Per-topic skill centred on the session's overall accuracy
+    skill = {topic: min(1.0, max(0.0, rng.uniform(0, 1) * 0.5 + correct_ratio * 0.5)) for topic in TOPICS}
+
+    results = []
+    for _ in range(n):
+        topic = rng.choice(TOPICS)
+        results.append({
+            "is_correct": rng.random() < skill[topic],
+            "time_spent": max(1, int(rng.uniform(0.5, 1.5) * avg_time)),
+            "topic": topic,
+            "difficulty": rng.randint(1, 5),
+        })
+    return results
+
+
+def synthetic_sessions(count: int, seed: int = 42, n_questions: Optional[int] = None) -> List[List[Dict]]:
+    rng = random.Random(seed)
+    return [synthetic_session(rng, n_questions) for _ in range(count)]
+
+
+def topics_wrong(results: List[Dict]) -> List[str]:
+    return [q["topic"] for q in results if not q["is_correct"]]
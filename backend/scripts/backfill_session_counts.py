@@ -0,0 +1,41 @@
+"""
+EYSH - test_sessions backfill
+Хуучин session-уудад total_questions, correct_count талбар нэмэх
+
+Usage (from backend/):
+    python -m scripts.backfill_session_counts
+
+Runs a single server-side update with an aggregation pipeline, so the
+answers arrays never leave MongoDB. Safe to re-run.
+"""
+
+from pymongo import MongoClient
+
+from app.config import get_settings
+
+
+def main():
+    settings = get_settings()
+    client = MongoClient(settings.mongodb_url)
+    sessions = client[settings.database_name]["test_sessions"]
+
+    result = sessions.update_many(
+        {"total_questions": {"$exists": False}},
+        [
+            {
+                "$set": {
+                    "total_questions": {"$size": {"$ifNull": ["$questions", []]}},
+                    "correct_count": {"$size": {"$filter": {
+                        "input": {"$ifNull": ["$questions", []]},
+                        "cond": "$$this.is_correct"
+                    }}},
+                }
+            }
+        ],
+    )
+    print(f"Backfilled {result.modified_count} test sessions")
+    client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+EYSH - Feature store export
+test_sessions, хариулт бүр, topic_views-ийг огноогоор хуваасан .npy баганууд руу гаргах
+
+Usage (from backend/):
+    python -m scripts.export_feature_store
+    python -m scripts.export_feature_store --root /data/feature_store --chunk-size 50000
+    python -m scripts.export_feature_store --rebuild
+
+Datasets (see app/services/feature_store.py for the layout):
+    sessions     one row per test session, plus level_features and
+                 weakness_features matrices from the shared extractor
+    answers      one row per answered question
+    topic_views  one row per topic view
+
+Incremental: each dataset remembers the last exported _id and a run only
+reads newer documents, in _id order, writing one part per chunk and day.
+A part is named after its first _id, so a run interrupted before saving
+its state rewrites the same parts on retry instead of duplicating them.
+"""
+
+import argparse
+import shutil
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+from bson import ObjectId
+from pymongo import MongoClient
+
+from app.config import get_settings
+from app.services.feature_store import FeatureStore
+from app.services.features import (
+    FEATURE_VERSION,
+    LEVEL_FEATURES,
+    WEAKNESS_FEATURES,
+    extract_feature_matrix,
+)
+
+SESSION_PROJECTION = {
+    "user_id": 1,
+    "completed_at": 1,
+    "score": 1,
+    "predicted_level": 1,
+    "total_questions": 1,
+    "correct_count": 1,
+    "adaptive_session_id": 1,
+    "ml_model_version": 1,
+    "questions.question_id": 1,
+    "questions.is_correct": 1,
+    "questions.time_spent": 1,
+    "questions.time_taken": 1,
+    "questions.topic": 1,
+    "questions.difficulty": 1,
+}
+
+
+def _ids(values) -> np.ndarray:
+    return np.array([str(v or "") for v in values], dtype="S24")
+
+
+def _dates(values) -> np.ndarray:
+    return np.array(values, dtype="datetime64[ms]")
+
+
+def _by_day(docs: List[Dict], time_field: str) -> Dict[str, List[Dict]]:
+    days = defaultdict(list)
+    for doc in docs:
+        when = doc.get(time_field) or doc["_id"].generation_time.replace(tzinfo=None)
+        doc[time_field] = when
+        days[when.strftime("%Y-%m-%d")].append(doc)
+    return days
+
+
+def session_columns(store: FeatureStore, docs: List[Dict]) -> Dict[str, np.ndarray]:
+    results = [doc.get("questions") or [] for doc in docs]
+    matrix = extract_feature_matrix(results)
+    return {
+        "session_id": _ids(doc["_id"] for doc in docs),
+        "user_id": _ids(doc.get("user_id") for doc in docs),
+        "completed_at": _dates([doc["completed_at"] for doc in docs]),
+        "score": np.array([doc.get("score", 0) for doc in docs], dtype=np.float32),
+        "predicted_level": np.array([doc.get("predicted_level", 0) for doc in docs], dtype=np.int8),
+        "total_questions": np.array([doc.get("total_questions", len(r)) for doc, r in zip(docs, results)], dtype=np.int16),
+        "correct_count": np.array(
+            [doc.get("correct_count", sum(1 for q in r if q.get("is_correct"))) for doc, r in zip(docs, results)],
+            dtype=np.int16,
+        ),
+        "adaptive": np.array(["adaptive_session_id" in doc for doc in docs]),
+        "ml_model_version": store.encode("sessions", "ml_model_version", (doc.get("ml_model_version") for doc in docs)),
+        "level_features": matrix.level,
+        "weakness_features": matrix.weakness,
+    }
+
+
+def answer_columns(store: FeatureStore, docs: List[Dict]) -> Dict[str, np.ndarray]:
+    rows = [(doc, q) for doc in docs for q in doc.get("questions") or []]
+    time_spent = [q.get("time_spent", q.get("time_taken")) for _, q in rows]
+    return {
+        "session_id": _ids(doc["_id"] for doc, _ in rows),
+        "user_id": _ids(doc.get("user_id") for doc, _ in rows),
+        "completed_at": _dates([doc["completed_at"] for doc, _ in rows]),
+        "question_id": _ids(q.get("question_id") for _, q in rows),
+        "topic": store.encode("answers", "topic", (q.get("topic") for _, q in rows)),
+        "is_correct": np.array([bool(q.get("is_correct")) for _, q in rows], dtype=bool),
+        "time_spent": np.array([np.nan if t is None else t for t in time_spent], dtype=np.float32),
+        "difficulty": np.array([q.get("difficulty") or 0 for _, q in rows], dtype=np.int8),
+    }
+
+
+def view_columns(store: FeatureStore, docs: List[Dict]) -> Dict[str, np.ndarray]:
+    return {
+        "view_id": _ids(doc["_id"] for doc in docs),
+        "user_id": _ids(doc.get("user_id") for doc in docs),
+        "viewed_at": _dates([doc["viewed_at"] for doc in docs]),
+        "topic": store.encode("topic_views", "topic", (doc.get("topic") for doc in docs)),
+    }
+
+
+def export(store: FeatureStore, collection, datasets, time_field: str, projection, chunk_size: int) -> int:
+    """
+    Нэг collection-ий шинэ document-уудыг гаргах
+
+    datasets: [(dataset нэр, багана үүсгэх функц)]; эхнийх нь state хадгална
+    """
+    state_dataset = datasets[0][0]
+    state = store.state(state_dataset)
+    query = {"_id": {"$gt": ObjectId(state["last_id"])}} if state.get("last_id") else {}
+    cursor = collection.find(query, projection).sort("_id", 1).batch_size(chunk_size)
+
+    exported = 0
+    chunk: List[Dict] = []
+
+    def flush():
+        nonlocal exported
+        days = _by_day(chunk, time_field)
+        parts = {
+            (name, day): build(store, docs)
+            for name, build in datasets
+            for day, docs in days.items()
+        }
+        # Dictionaries first, so no part ever references an unknown code
+        for name, _ in datasets:
+            store.save_dictionaries(name)
+        for (name, day), columns in parts.items():
+            if len(next(iter(columns.values()))):
+                store.write_part(name, day, str(days[day][0]["_id"]), columns)
+        exported += len(chunk)
+        for name, _ in datasets:
+            previous = store.state(name)
+            store.save_state(name, {
+                "last_id": str(chunk[-1]["_id"]),
+                "documents": previous.get("documents", 0) + len(chunk),
+                "feature_version": FEATURE_VERSION,
+            })
+        print(f"{state_dataset}: {exported:,} documents", end="\r", flush=True)
+
+    for doc in cursor:
+        chunk.append(doc)
+        if len(chunk) == chunk_size:
+            flush()
+            chunk = []
+    if chunk:
+        flush()
+    print(f"{state_dataset}: exported {exported:,} new documents")
+    return exported
+
+
+def main():
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Export MongoDB collections to the .npy feature store")
+    parser.add_argument("--root", type=Path, default=Path(settings.feature_store_path))
+    parser.add_argument("--chunk-size", type=int, default=20000)
+    parser.add_argument("--rebuild", action="store_true", help="Delete the store and export everything")
+    args = parser.parse_args()
+
+    if args.rebuild and args.root.exists():
+        shutil.rmtree(args.root)
+    store = FeatureStore(args.root)
+
+    schema = store.state("sessions")
+    if schema.get("feature_version", FEATURE_VERSION) != FEATURE_VERSION:
+        raise SystemExit(
+            f"Store holds feature_version {schema['feature_version']}, code is {FEATURE_VERSION}; rerun with --rebuild"
+        )
+    print(f"Feature columns: level={LEVEL_FEATURES} weakness={WEAKNESS_FEATURES}")
+
+    client = MongoClient(settings.mongodb_url)
+    db = client[settings.database_name]
+    export(
+        store, db["test_sessions"],
+        [("sessions", session_columns), ("answers", answer_columns)],
+        "completed_at", SESSION_PROJECTION, args.chunk_size,
+    )
+    export(
+        store, db["topic_views"],
+        [("topic_views", view_columns)],
+        "viewed_at", None, args.chunk_size,
+    )
+    client.close()
+
+
+if __name__ == "__main__":
+    main()
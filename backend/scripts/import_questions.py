@@ -0,0 +1,49 @@
+"""
+EYSH - Question bank import
+NDJSON/CSV файлаас асуултын санг бөөнөөр оруулах
+
+Usage (from backend/):
+    python -m scripts.import_questions questions.ndjson
+    python -m scripts.import_questions questions.csv --chunk-size 5000
+
+Rows are validated against QuestionBase and upserted by content hash, so
+re-importing the same file is safe. CSV list columns (options, tags) take
+either a JSON array or "|"-separated values.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from app.db import connect_to_mongo, close_mongo_connection, ensure_indexes
+from app.services.question_import import DEFAULT_CHUNK_SIZE, detect_format, import_questions
+
+
+async def run(path: str, fmt: str, chunk_size: int):
+    await connect_to_mongo()
+    try:
+        await ensure_indexes()
+        start = time.perf_counter()
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            report = await import_questions(f, fmt, chunk_size)
+        elapsed = time.perf_counter() - start
+    finally:
+        await close_mongo_connection()
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    print(f"{report['rows']} rows in {elapsed:.2f}s ({report['rows'] / max(elapsed, 1e-9):,.0f} rows/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import questions from NDJSON/CSV")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["ndjson", "csv"], default=None)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.path, args.format or detect_format(args.path), args.chunk_size))
+
+
+if __name__ == "__main__":
+    main()
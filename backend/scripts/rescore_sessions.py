@@ -0,0 +1,171 @@
+"""
+EYSH - test_sessions re-scoring
+Шинэ моделиор хуучин session-уудын predicted_level, weak_topics-ийг дахин тооцох
+
+Usage (from backend/):
+    python -m scripts.rescore_sessions
+    python -m scripts.rescore_sessions --workers 8 --batch-size 2000
+    python -m scripts.rescore_sessions --restart
+
+Streams test_sessions in _id order with a batched cursor and only the
+answer fields projected. Each batch is scored in a worker process
+(bulk feature extraction, one model call per batch) and written back with
+an unordered bulk_write. At most 2 x --workers batches are in flight, so
+memory stays flat regardless of collection size.
+
+After every written batch the last _id is saved to --checkpoint; a rerun
+continues from there as long as the active model version is unchanged.
+Sessions already stamped with the active version are skipped. Adaptive
+sessions keep their IRT level and only get weak_topics re-scored.
+Roadmaps are not regenerated.
+
+Sessions saved before answers carried topic and difficulty cannot be
+featurized (every topic would read as unknown), so they are skipped and
+keep their stored results; the run reports how many.
+"""
+
+import argparse
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from bson import ObjectId
+from pymongo import MongoClient, UpdateOne
+
+from app.config import get_settings
+from app.services.ml_service import MLService
+
+DEFAULT_CHECKPOINT = Path(__file__).resolve().parents[1] / "spill" / "rescore_checkpoint.json"
+PROJECTION = {
+    "questions.is_correct": 1,
+    "questions.time_spent": 1,
+    "questions.time_taken": 1,
+    "questions.topic": 1,
+    "questions.difficulty": 1,
+    "adaptive_session_id": 1,
+}
+
+_service: Optional[MLService] = None
+
+
+def _init_worker(models_path: Optional[str], version: str):
+    global _service
+    _service = MLService(Path(models_path) if models_path else None)
+    _service.load_all()
+    if _service.model_version != version:
+        raise RuntimeError(f"Worker loaded model {_service.model_version}, expected {version}")
+
+
+def score_batch(batch: List[Dict]) -> List[UpdateOne]:
+    """Worker: нэг batch-ийг үнэлж, update-үүдийг буцаах"""
+    sessions = [doc.get("questions") or [] for doc in batch]
+    topics_wrong = [[q.get("topic", "") for q in results if not q.get("is_correct")] for results in sessions]
+    levels, weak_topics, version = _service.assess_batch(sessions, topics_wrong)
+
+    rescored_at = datetime.utcnow()
+    updates = []
+    for doc, level, weak in zip(batch, levels, weak_topics):
+        fields = {"weak_topics": weak, "ml_model_version": version, "rescored_at": rescored_at}
+        if "adaptive_session_id" not in doc:
+            fields["predicted_level"] = level
+        updates.append(UpdateOne({"_id": doc["_id"]}, {"$set": fields}))
+    return updates
+
+
+def load_checkpoint(path: Path, version: str) -> Optional[ObjectId]:
+    if not path.exists():
+        return None
+    checkpoint = json.loads(path.read_text(encoding="utf-8"))
+    if checkpoint.get("version") != version:
+        print(f"Checkpoint is for model {checkpoint.get('version')}, starting over for {version}")
+        return None
+    return ObjectId(checkpoint["last_id"])
+
+
+def save_checkpoint(path: Path, version: str, last_id: ObjectId, scored: int):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps({"version": version, "last_id": str(last_id), "scored": scored}), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def batches(cursor, size: int):
+    batch = []
+    for doc in cursor:
+        batch.append(doc)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score test_sessions with the active models")
+    parser.add_argument("--models-path", type=str, default=None)
+    parser.add_argument("--batch-size", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--checkpoint", type=Path, default=DEFAULT_CHECKPOINT)
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint")
+    args = parser.parse_args()
+
+    version = MLService(Path(args.models_path) if args.models_path else None).model_version
+    start_after = None if args.restart else load_checkpoint(args.checkpoint, version)
+
+    settings = get_settings()
+    client = MongoClient(settings.mongodb_url)
+    sessions = client[settings.database_name]["test_sessions"]
+
+    query: Dict = {"ml_model_version": {"$ne": version}}
+    if start_after is not None:
+        query["_id"] = {"$gt": start_after}
+        print(f"Resuming after {start_after}")
+    # Legacy sessions without per-answer topics would be scored as all-unknown
+    legacy = sessions.count_documents({**query, "questions.topic": {"$exists": False}})
+    if legacy:
+        print(f"Skipping {legacy:,} legacy sessions without questions.topic")
+    query["questions.topic"] = {"$exists": True}
+    cursor = sessions.find(query, PROJECTION).sort("_id", 1).batch_size(args.batch_size)
+
+    scored = 0
+    started = time.perf_counter()
+    in_flight = deque()
+
+    def drain_one():
+        nonlocal scored
+        last_id, future = in_flight.popleft()
+        updates = future.result()
+        if updates:
+            sessions.bulk_write(updates, ordered=False)
+        scored += len(updates)
+        # Futures are drained in submission order, so everything up to last_id is written
+        save_checkpoint(args.checkpoint, version, last_id, scored)
+        elapsed = time.perf_counter() - started
+        print(f"{scored:,} sessions ({scored / max(elapsed, 1e-9):,.0f}/s)", end="\r", flush=True)
+
+    with ProcessPoolExecutor(
+        max_workers=args.workers,
+        initializer=_init_worker,
+        initargs=(args.models_path, version),
+    ) as pool:
+        for batch in batches(cursor, args.batch_size):
+            in_flight.append((batch[-1]["_id"], pool.submit(score_batch, batch)))
+            if len(in_flight) >= args.workers * 2:
+                drain_one()
+        while in_flight:
+            drain_one()
+
+    elapsed = time.perf_counter() - started
+    print(f"\nRe-scored {scored:,} test sessions with model {version} in {elapsed:.1f}s")
+    if legacy:
+        print(f"Skipped {legacy:,} legacy sessions (no questions.topic); their stored results are unchanged")
+    client.close()
+
+
+if __name__ == "__main__":
+    main()
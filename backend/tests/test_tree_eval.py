@@ -0,0 +1,117 @@
+"""
+tree_eval parity: compiled evaluators must match sklearn bit for bit
+
+Run from backend/:
+    python -m pytest tests
+"""
+
+import numpy as np
+import pytest
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+from app.services.tree_eval import (
+    SKLEARN_MIN_ROWS,
+    CompiledForestClassifier,
+    CompiledGradientBoostingRegressor,
+    CompiledStandardScaler,
+    compile_model,
+)
+
+N_FEATURES = 8
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(600, N_FEATURES))
+    y_class = (X[:, 0] + X[:, 1] * 2 + rng.normal(scale=0.5, size=len(X))).round().clip(-3, 3).astype(int)
+    y_reg = X[:, 0] * 3 - X[:, 2] ** 2 + rng.normal(scale=0.1, size=len(X))
+    return X, y_class, y_reg
+
+
+@pytest.fixture(scope="module")
+def forest(data):
+    X, y_class, _ = data
+    return RandomForestClassifier(n_estimators=25, max_depth=8, random_state=0, n_jobs=1).fit(X, y_class)
+
+
+@pytest.fixture(scope="module", params=["mean", "zero"])
+def boosting(request, data):
+    X, _, y_reg = data
+    init = "zero" if request.param == "zero" else None
+    return GradientBoostingRegressor(n_estimators=40, max_depth=4, init=init, random_state=0).fit(X, y_reg)
+
+
+def random_rows(n: int, seed: int = 1) -> np.ndarray:
+    return np.random.default_rng(seed).uniform(-4, 4, size=(n, N_FEATURES))
+
+
+def threshold_rows(trees) -> np.ndarray:
+    """Rows sitting exactly on split thresholds and one float32 ulp either side"""
+    splits = [
+        (feature, threshold)
+        for tree in trees
+        for feature, threshold in zip(tree.feature, tree.threshold)
+        if feature >= 0
+    ][:150]
+    rows = []
+    base = random_rows(len(splits), seed=2)
+    for row, (feature, threshold) in zip(base, splits):
+        t32 = np.float32(threshold)
+        for value in (threshold, t32, np.nextafter(t32, np.float32(-np.inf)), np.nextafter(t32, np.float32(np.inf))):
+            edge = row.copy()
+            edge[feature] = value
+            rows.append(edge)
+    return np.array(rows)
+
+
+def chunks(X: np.ndarray):
+    # Stay below SKLEARN_MIN_ROWS so the compiled path does the work
+    for start in range(0, len(X), SKLEARN_MIN_ROWS - 1):
+        yield X[start:start + SKLEARN_MIN_ROWS - 1]
+
+
+def test_forest_classifier_is_bit_identical(forest):
+    compiled = compile_model(forest)
+    assert isinstance(compiled, CompiledForestClassifier)
+    X = np.vstack([random_rows(1000), threshold_rows([e.tree_ for e in forest.estimators_])])
+    for chunk in chunks(X):
+        assert np.array_equal(compiled.predict_proba(chunk), forest.predict_proba(chunk))
+        assert np.array_equal(compiled.predict(chunk), forest.predict(chunk))
+
+
+def test_gradient_boosting_is_bit_identical(boosting):
+    compiled = compile_model(boosting)
+    assert isinstance(compiled, CompiledGradientBoostingRegressor)
+    X = np.vstack([random_rows(1000), threshold_rows([e.tree_ for e in boosting.estimators_[:, 0]])])
+    for chunk in chunks(X):
+        assert np.array_equal(compiled.predict(chunk), boosting.predict(chunk))
+
+
+def test_single_row_matches(forest, boosting):
+    row = random_rows(1, seed=3)
+    assert np.array_equal(compile_model(forest).predict_proba(row), forest.predict_proba(row))
+    assert np.array_equal(compile_model(boosting).predict(row), boosting.predict(row))
+
+
+def test_large_batches_match(forest, boosting):
+    X = random_rows(SKLEARN_MIN_ROWS + 10, seed=4)
+    assert np.array_equal(compile_model(forest).predict_proba(X), forest.predict_proba(X))
+    assert np.array_equal(compile_model(boosting).predict(X), boosting.predict(X))
+
+
+def test_standard_scaler_is_bit_identical(data):
+    X = data[0]
+    scaler = StandardScaler().fit(X)
+    compiled = compile_model(scaler)
+    assert isinstance(compiled, CompiledStandardScaler)
+    rows = random_rows(500, seed=5)
+    assert np.array_equal(compiled.transform(rows), scaler.transform(rows))
+
+
+def test_unsupported_models_are_not_compiled(data):
+    X, _, y_reg = data
+    huber = GradientBoostingRegressor(loss="huber", n_estimators=5, random_state=0).fit(X, y_reg)
+    assert compile_model(huber) is None
+    assert compile_model(None) is None
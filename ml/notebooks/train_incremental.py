@@ -0,0 +1,286 @@
+"""
+EYSH - Incremental training from real test sessions
+Бодит test_sessions-оос түвшин ба сул сэдвийн моделийг хэсэгчлэн сургах
+
+Usage (from ml/notebooks/):
+    python train_incremental.py                      # full pass over history
+    python train_incremental.py --resume             # only sessions newer than the last run
+    python train_incremental.py --level-labels irt --activate
+
+Streams test_sessions from MongoDB in --chunk-size batches (only the
+answer fields are projected), turns every chunk into features with the
+backend's shared extractor and updates SGDClassifier models with
+partial_fit, so memory is bounded by one chunk however long the history.
+A fresh run makes one streaming pass to fit the scaler, then --epochs
+passes for the models. --resume keeps the active scaler fixed and
+continues from the last trained _id.
+
+Labels:
+    level     formula: the same weighted score train_models.py uses. It is a
+                       deterministic function of the level features, so the
+                       model only learns to reproduce the formula; use it to
+                       bootstrap, not as a measure of real ability
+              irt:     predicted_level of adaptive sessions (IRT ability)
+    weakness  the topic with the lowest score, as in train_models.py
+
+Sessions saved before answers carried a topic are skipped: all their topic
+scores read as the neutral 0.5 and argmin would label every one of them as
+the first topic.
+
+The result is written as a new version directory in ml/trained_models
+with the roadmap model copied from the active set (when it has one). --activate points
+CURRENT at it and running backends pick it up on their next reload check.
+train_models.py remains the synthetic bootstrap for an empty database.
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import shutil
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import joblib
+import numpy as np
+from bson import ObjectId
+from pymongo import MongoClient
+from sklearn.linear_model import SGDClassifier
+from sklearn.preprocessing import StandardScaler
+
+# Shared feature definition (same module the backend uses for inference)
+_features_path = Path(__file__).resolve().parents[2] / 'backend' / 'app' / 'services' / 'features.py'
+_spec = importlib.util.spec_from_file_location('eysh_features', _features_path)
+features = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(features)
+
+MODELS_ROOT = Path(__file__).resolve().parents[1] / 'trained_models'
+LEVEL_CLASSES = np.arange(1, 11)
+WEAKNESS_CLASSES = np.arange(len(features.TOPICS))
+PROJECTION = {
+    'questions.is_correct': 1,
+    'questions.time_spent': 1,
+    'questions.time_taken': 1,
+    'questions.topic': 1,
+    'questions.difficulty': 1,
+    'predicted_level': 1,
+}
+# Every 10th session (by _id) is held out for evaluation
+HOLDOUT_MOD = 10
+
+
+def active_model_dir(root: Path) -> Path:
+    current = root / 'CURRENT'
+    return root / current.read_text(encoding='utf-8').strip() if current.exists() else root
+
+
+def formula_levels(level_features: np.ndarray) -> np.ndarray:
+    """train_models.py-ийн weighted score-оор түвшин (noise-гүй)"""
+    correct_ratio, avg_time, hard_ratio = level_features[:, 0], level_features[:, 1], level_features[:, 2]
+    topic_mean = level_features[:, 3:].mean(axis=1)
+    weighted = correct_ratio * 30 + hard_ratio * 20 + (1 - avg_time / 200) * 10 + topic_mean * 0.4
+    weighted = np.clip(weighted, 0, 100)
+    return np.clip(np.ceil(weighted / 10), 1, 10).astype(int)
+
+
+def is_holdout(doc) -> bool:
+    return int(str(doc['_id'])[-6:], 16) % HOLDOUT_MOD == 0
+
+
+def stream_chunks(collection, query, chunk_size):
+    """test_sessions-ийг _id дарааллаар chunk болгон уншина"""
+    chunk = []
+    cursor = collection.find(query, PROJECTION).sort('_id', 1).batch_size(chunk_size)
+    for doc in cursor:
+        chunk.append(doc)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def chunk_arrays(chunk, level_labels):
+    """Chunk-ийг (level X, level y, weakness X, weakness y) болгох"""
+    matrix = features.extract_feature_matrix(doc.get('questions') or [] for doc in chunk)
+    answered = np.array([bool(doc.get('questions')) for doc in chunk])
+    if level_labels == 'irt':
+        y_level = np.array([doc.get('predicted_level', 0) for doc in chunk])
+        has_level = answered & np.isin(y_level, LEVEL_CLASSES)
+    else:
+        y_level = formula_levels(matrix.level)
+        has_level = answered
+    y_weakness = np.argmin(matrix.weakness, axis=1)
+    # A constant topic vector has no weakest topic; argmin would say index 0
+    has_weakness = answered & (np.ptp(matrix.weakness, axis=1) > 0)
+    return (
+        matrix.level[has_level], y_level[has_level],
+        matrix.weakness[has_weakness], y_weakness[has_weakness],
+    )
+
+
+class StreamingAccuracy:
+    def __init__(self):
+        self.correct = 0
+        self.total = 0
+
+    def update(self, y_true, y_pred):
+        self.correct += int((y_true == y_pred).sum())
+        self.total += len(y_true)
+
+    @property
+    def value(self):
+        return self.correct / self.total if self.total else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Incremental training from test_sessions')
+    parser.add_argument('--mongodb-url', default=os.getenv('MONGODB_URL', 'mongodb://localhost:27017'))
+    parser.add_argument('--database', default=os.getenv('DATABASE_NAME', 'eysh'))
+    parser.add_argument('--chunk-size', type=int, default=10000)
+    parser.add_argument('--epochs', type=int, default=3)
+    parser.add_argument('--level-labels', choices=['formula', 'irt'], default='formula')
+    parser.add_argument('--resume', action='store_true', help='Continue the active SGD models on newer sessions')
+    parser.add_argument('--version', default=None, help='Output version name (default: timestamp)')
+    parser.add_argument('--activate', action='store_true', help='Point ml/trained_models/CURRENT at the result')
+    args = parser.parse_args()
+
+    client = MongoClient(args.mongodb_url)
+    sessions = client[args.database]['test_sessions']
+    source_dir = active_model_dir(MODELS_ROOT)
+    source_meta = json.loads((source_dir / 'model_metadata.json').read_text(encoding='utf-8'))
+
+    print('=' * 60)
+    print('EYSH Incremental Training')
+    print('=' * 60)
+
+    # Legacy sessions have no per-answer topic to featurize
+    query = {'questions.topic': {'$exists': True}}
+    if args.level_labels == 'irt':
+        query['adaptive_session_id'] = {'$exists': True}
+
+    if args.resume:
+        training = source_meta.get('level_predictor', {}).get('training')
+        if not training or source_meta['level_predictor'].get('model_type') != 'SGDClassifier':
+            sys.exit('Active models were not trained incrementally; run without --resume first')
+        level_scaler = joblib.load(source_dir / 'level_scaler.joblib')
+        level_model = joblib.load(source_dir / 'level_predictor.joblib')
+        weakness_model = joblib.load(source_dir / 'weakness_detector.joblib')
+        query['_id'] = {'$gt': ObjectId(training['last_id'])}
+        sessions_seen = training['sessions']
+        epochs = 1
+        print(f"\nResuming after {training['last_id']} ({sessions_seen:,} sessions so far)")
+    else:
+        # Pass 1: scaler statistics
+        print('\n1. Fitting level scaler (streaming pass)...')
+        level_scaler = StandardScaler()
+        for chunk in stream_chunks(sessions, query, args.chunk_size):
+            X_level, _, _, _ = chunk_arrays(chunk, args.level_labels)
+            if len(X_level):
+                level_scaler.partial_fit(X_level)
+        if not hasattr(level_scaler, 'mean_'):
+            sys.exit('No usable test sessions found; bootstrap with train_models.py')
+        level_model = SGDClassifier(loss='log_loss', alpha=1e-4, random_state=42)
+        weakness_model = SGDClassifier(loss='log_loss', alpha=1e-4, random_state=42)
+        sessions_seen = 0
+        epochs = args.epochs
+
+    # Pass 2..n: partial_fit on training chunks, evaluate on the holdout
+    last_id = None
+    for epoch in range(epochs):
+        print(f'\n2. Training epoch {epoch + 1}/{epochs}...')
+        level_acc, weakness_acc = StreamingAccuracy(), StreamingAccuracy()
+        trained = 0
+        for chunk in stream_chunks(sessions, query, args.chunk_size):
+            holdout = np.array([is_holdout(doc) for doc in chunk])
+            train_chunk = [doc for doc, h in zip(chunk, holdout) if not h]
+            test_chunk = [doc for doc, h in zip(chunk, holdout) if h]
+            last_id = chunk[-1]['_id']
+
+            if train_chunk:
+                X_level, y_level, X_weak, y_weak = chunk_arrays(train_chunk, args.level_labels)
+                if len(X_level):
+                    level_model.partial_fit(level_scaler.transform(X_level), y_level, classes=LEVEL_CLASSES)
+                if len(X_weak):
+                    weakness_model.partial_fit(X_weak, y_weak, classes=WEAKNESS_CLASSES)
+                trained += len(train_chunk)
+
+            if test_chunk and hasattr(level_model, 'coef_'):
+                X_level, y_level, X_weak, y_weak = chunk_arrays(test_chunk, args.level_labels)
+                if len(X_level):
+                    level_acc.update(y_level, level_model.predict(level_scaler.transform(X_level)))
+                if len(X_weak):
+                    weakness_acc.update(y_weak, weakness_model.predict(X_weak))
+        print(f'   Trained on {trained:,} sessions')
+        print(f'   Holdout level accuracy: {level_acc.value}')
+        print(f'   Holdout weakness accuracy: {weakness_acc.value}')
+        if epoch == 0:
+            sessions_seen += trained
+
+    if last_id is None:
+        print('\nNo new sessions; models unchanged')
+        client.close()
+        return
+
+    # Save as a new version next to the active one
+    version = args.version or datetime.utcnow().strftime('%Y%m%d-%H%M%S')
+    out_dir = MODELS_ROOT / version
+    out_dir.mkdir(parents=True, exist_ok=False)
+    print(f'\n3. Saving model set {version}...')
+    for name in ('roadmap_generator.joblib', 'roadmap_scaler.joblib'):
+        if (source_dir / name).exists():
+            shutil.copy2(source_dir / name, out_dir / name)
+        else:
+            print(f'   {name} not found in {source_dir}; skipped')
+    joblib.dump(level_model, out_dir / 'level_predictor.joblib')
+    joblib.dump(level_scaler, out_dir / 'level_scaler.joblib')
+    joblib.dump(weakness_model, out_dir / 'weakness_detector.joblib')
+    joblib.dump(features.TOPICS, out_dir / 'topic_names.joblib')
+
+    training = {
+        'source': 'test_sessions',
+        'level_labels': args.level_labels,
+        'last_id': str(last_id),
+        'sessions': sessions_seen,
+        'trained_at': datetime.utcnow().isoformat(),
+    }
+    metadata = {
+        'level_predictor': {
+            'features': features.LEVEL_FEATURES,
+            'output': 'level (1-10)',
+            'model_type': 'SGDClassifier',
+            'accuracy': level_acc.value,
+            'feature_version': features.FEATURE_VERSION,
+            'training': training,
+        },
+        'weakness_detector': {
+            'features': features.WEAKNESS_FEATURES,
+            'output': 'weakest_topic_index',
+            'topics': features.TOPICS,
+            'model_type': 'SGDClassifier',
+            'accuracy': weakness_acc.value,
+            'feature_version': features.FEATURE_VERSION,
+            'training': training,
+        },
+    }
+    if 'roadmap_generator' in source_meta:
+        metadata['roadmap_generator'] = source_meta['roadmap_generator']
+    with open(out_dir / 'model_metadata.json', 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, indent=2, ensure_ascii=False)
+
+    if args.activate:
+        tmp = MODELS_ROOT / 'CURRENT.tmp'
+        tmp.write_text(version + '\n', encoding='utf-8')
+        os.replace(tmp, MODELS_ROOT / 'CURRENT')
+        print(f'   CURRENT -> {version}')
+
+    print('\n' + '=' * 60)
+    print('Training Complete!')
+    print('=' * 60)
+    print(f'\nModels saved in: {out_dir}')
+    client.close()
+
+
+if __name__ == '__main__':
+    main()
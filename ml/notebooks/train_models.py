@@ -12,6 +12,41 @@ from sklearn.metrics import classification_report, mean_squared_error
 import joblib
 import json
 import os
+import importlib.util
+from pathlib import Path
+
+# Shared feature definition (same module the backend uses for inference)
+_features_path = Path(__file__).resolve().parents[2] / 'backend' / 'app' / 'services' / 'features.py'
+_spec = importlib.util.spec_from_file_location('eysh_features', _features_path)
+features = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(features)
+
+# Optional real features exported by backend/scripts/export_feature_store.py:
+#   FEATURE_STORE=../data/feature_store python train_models.py
+# Level and weakness models then train on the session features, concatenated
+# into memory across parts since fit needs one matrix (labels still come from
+# the formulas below); without it, synthetic data.
+store_sessions = {}
+if os.getenv('FEATURE_STORE'):
+    _store_spec = importlib.util.spec_from_file_location('eysh_feature_store', _features_path.parent / 'feature_store.py')
+    feature_store = importlib.util.module_from_spec(_store_spec)
+    _store_spec.loader.exec_module(feature_store)
+    store_sessions = feature_store.FeatureStore(os.getenv('FEATURE_STORE')).load(
+        'sessions', ['level_features', 'weakness_features']
+    )
+training_data = 'feature_store' if store_sessions else 'synthetic'
+
+# TUNE=1 replaces the fixed hyperparameters with a cross-validated search
+# (see tuning.py); results land in model_metadata.json under 'search'
+TUNE = os.getenv('TUNE') == '1'
+TUNE_WORKERS = int(os.getenv('TUNE_WORKERS', '0')) or None
+TUNE_MAX_LATENCY_US = float(os.getenv('TUNE_MAX_LATENCY_US')) if os.getenv('TUNE_MAX_LATENCY_US') else None
+searches = {}
+if TUNE:
+    import tuning
+    LEVEL_GRID = {'n_estimators': [50, 100, 200], 'max_depth': [6, 10, 14]}
+    WEAKNESS_GRID = {'n_estimators': [50, 100, 200], 'max_depth': [6, 8, 12]}
+    ROADMAP_GRID = {'n_estimators': [50, 100, 200], 'max_depth': [3, 5], 'learning_rate': [0.05, 0.1]}
 
 # Create directories
 os.makedirs('../trained_models', exist_ok=True)
@@ -31,18 +66,21 @@ np.random.seed(42)
 n_samples = 5000
 
 # Features
-level_data = {
-    'correct_ratio': np.random.uniform(0.1, 1.0, n_samples),
-    'avg_time_per_question': np.random.uniform(20, 180, n_samples),
-    'hard_correct_ratio': np.random.uniform(0, 1, n_samples),
-    'algebra_score': np.random.uniform(0, 100, n_samples),
-    'geometry_score': np.random.uniform(0, 100, n_samples),
-    'trigonometry_score': np.random.uniform(0, 100, n_samples),
-    'calculus_score': np.random.uniform(0, 100, n_samples),
-    'probability_score': np.random.uniform(0, 100, n_samples),
-}
-
-df_level = pd.DataFrame(level_data)
+if store_sessions:
+    df_level = pd.DataFrame(np.asarray(store_sessions['level_features']), columns=features.LEVEL_FEATURES)
+    n_samples = len(df_level)
+else:
+    level_data = {
+        'correct_ratio': np.random.uniform(0.1, 1.0, n_samples),
+        'avg_time_per_question': np.random.uniform(20, 180, n_samples),
+        'hard_correct_ratio': np.random.uniform(0, 1, n_samples),
+        'algebra_score': np.random.uniform(0, 100, n_samples),
+        'geometry_score': np.random.uniform(0, 100, n_samples),
+        'trigonometry_score': np.random.uniform(0, 100, n_samples),
+        'calculus_score': np.random.uniform(0, 100, n_samples),
+        'probability_score': np.random.uniform(0, 100, n_samples),
+    }
+    df_level = pd.DataFrame(level_data)
 
 # Calculate weighted score for level
 weighted = (
@@ -61,6 +99,7 @@ df_level['level'] = pd.cut(weighted, bins=10, labels=range(1, 11)).astype(int)
 # Train
 X_level = df_level.drop('level', axis=1)
 y_level = df_level['level']
+assert list(X_level.columns) == features.LEVEL_FEATURES
 
 X_train, X_test, y_train, y_test = train_test_split(
     X_level, y_level, test_size=0.2, random_state=42, stratify=y_level
@@ -72,13 +111,19 @@ X_train_scaled = level_scaler.fit_transform(X_train)
 X_test_scaled = level_scaler.transform(X_test)
 
 # Model
-level_model = RandomForestClassifier(
-    n_estimators=100, 
-    max_depth=10,
-    random_state=42,
-    n_jobs=-1
-)
-level_model.fit(X_train_scaled, y_train)
+if TUNE:
+    level_model, searches['level_predictor'] = tuning.search(
+        'level_predictor', 'RandomForestClassifier', LEVEL_GRID, X_train_scaled, y_train.values,
+        TUNE_WORKERS, TUNE_MAX_LATENCY_US
+    )
+else:
+    level_model = RandomForestClassifier(
+        n_estimators=100, 
+        max_depth=10,
+        random_state=42,
+        n_jobs=-1
+    )
+    level_model.fit(X_train_scaled, y_train)
 
 # Evaluate
 train_acc = level_model.score(X_train_scaled, y_train)
@@ -100,7 +145,7 @@ print("\n2. Training Weakness Detector Model...")
 # Multi-label classification for weakness detection
 np.random.seed(43)
 n_samples = 5000
-topics = ['algebra', 'geometry', 'trigonometry', 'calculus', 'probability', 'sequences', 'functions', 'vectors']
+topics = features.TOPICS
 
 weakness_data = {
     f'{topic}_attempts': np.random.randint(1, 20, n_samples) for topic in topics
@@ -119,21 +164,30 @@ for topic in topics:
     df_weakness[f'{topic}_score'] = df_weakness[f'{topic}_score'].clip(0, 1)
 
 # Features
-feature_cols = [f'{topic}_score' for topic in topics]
-X_weakness = df_weakness[feature_cols]
+feature_cols = features.WEAKNESS_FEATURES
+if store_sessions:
+    X_weakness = pd.DataFrame(np.asarray(store_sessions['weakness_features']), columns=feature_cols)
+else:
+    X_weakness = df_weakness[feature_cols]
 
 # Find weakest topic for each sample
 weakness_scores = X_weakness.values
 weakest_indices = np.argmin(weakness_scores, axis=1)
 
 # Train a model to predict which topic is weakest
-weakness_model = RandomForestClassifier(
-    n_estimators=100,
-    max_depth=8,
-    random_state=42,
-    n_jobs=-1
-)
-weakness_model.fit(X_weakness, weakest_indices)
+if TUNE:
+    weakness_model, searches['weakness_detector'] = tuning.search(
+        'weakness_detector', 'RandomForestClassifier', WEAKNESS_GRID, X_weakness.values, weakest_indices,
+        TUNE_WORKERS, TUNE_MAX_LATENCY_US
+    )
+else:
+    weakness_model = RandomForestClassifier(
+        n_estimators=100,
+        max_depth=8,
+        random_state=42,
+        n_jobs=-1
+    )
+    weakness_model.fit(X_weakness, weakest_indices)
 
 print(f"   Topics: {topics}")
 print(f"   Accuracy: {weakness_model.score(X_weakness, weakest_indices):.4f}")
@@ -186,12 +240,18 @@ X_train_scaled = roadmap_scaler.fit_transform(X_train)
 X_test_scaled = roadmap_scaler.transform(X_test)
 
 # Model
-roadmap_model = GradientBoostingRegressor(
-    n_estimators=100,
-    max_depth=5,
-    random_state=42
-)
-roadmap_model.fit(X_train_scaled, y_train)
+if TUNE:
+    roadmap_model, searches['roadmap_generator'] = tuning.search(
+        'roadmap_generator', 'GradientBoostingRegressor', ROADMAP_GRID, X_train_scaled, y_train.values,
+        TUNE_WORKERS, TUNE_MAX_LATENCY_US
+    )
+else:
+    roadmap_model = GradientBoostingRegressor(
+        n_estimators=100,
+        max_depth=5,
+        random_state=42
+    )
+    roadmap_model.fit(X_train_scaled, y_train)
 
 # Evaluate
 train_pred = roadmap_model.predict(X_train_scaled)
@@ -214,21 +274,29 @@ metadata = {
         'features': list(X_level.columns),
         'output': 'level (1-10)',
         'model_type': 'RandomForestClassifier',
-        'accuracy': float(test_acc)
+        'accuracy': float(test_acc),
+        'feature_version': features.FEATURE_VERSION,
+        'training_data': training_data
     },
     'weakness_detector': {
         'features': feature_cols,
         'output': 'weakest_topic_index',
         'topics': topics,
-        'model_type': 'RandomForestClassifier'
+        'model_type': 'RandomForestClassifier',
+        'feature_version': features.FEATURE_VERSION,
+        'training_data': training_data
     },
     'roadmap_generator': {
         'features': list(X_roadmap.columns),
         'output': 'recommended_hours_per_week',
-        'model_type': 'GradientBoostingRegressor'
+        'model_type': 'GradientBoostingRegressor',
+        'feature_version': features.FEATURE_VERSION
     }
 }
 
+for name, report in searches.items():
+    metadata[name]['search'] = report
+
 with open('../trained_models/model_metadata.json', 'w', encoding='utf-8') as f:
     json.dump(metadata, f, indent=2, ensure_ascii=False)
 
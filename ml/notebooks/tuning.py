@@ -0,0 +1,142 @@
+"""
+EYSH - Hyperparameter search for train_models.py
+Моделийн hyperparameter-ийг cross-validation-аар сонгох
+
+Used by train_models.py when TUNE=1:
+    TUNE=1 python train_models.py
+    TUNE=1 TUNE_WORKERS=8 TUNE_MAX_LATENCY_US=150 python train_models.py
+
+Every (candidate, fold) pair runs as one task in a process pool. The
+feature matrix and labels are dumped once to a temp directory and each
+worker memory-maps them, so no task pickles the data. Every candidate is
+scored by cross-validation and timed for fitting and for single-row
+inference on the path the backend serves (the compiled tree evaluator
+when the model supports it). The best candidate is chosen by CV score,
+optionally only among those under TUNE_MAX_LATENCY_US, and refit on the
+full data. All candidates are returned so the accuracy/latency frontier
+can be read from model_metadata.json.
+"""
+
+import importlib.util
+import itertools
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestClassifier
+from sklearn.model_selection import KFold, StratifiedKFold
+
+# Compiled evaluator the backend serves with (NumPy/sklearn only)
+_tree_eval_path = Path(__file__).resolve().parents[2] / 'backend' / 'app' / 'services' / 'tree_eval.py'
+_spec = importlib.util.spec_from_file_location('eysh_tree_eval', _tree_eval_path)
+tree_eval = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(tree_eval)
+
+ESTIMATORS = {
+    'RandomForestClassifier': RandomForestClassifier,
+    'GradientBoostingRegressor': GradientBoostingRegressor,
+}
+CV_FOLDS = 3
+LATENCY_CALLS = 200
+
+
+def _folds(y, classifier):
+    splitter = StratifiedKFold if classifier else KFold
+    return list(splitter(n_splits=CV_FOLDS, shuffle=True, random_state=42).split(np.zeros(len(y)), y))
+
+
+def _single_row_latency_us(model, row):
+    compiled = tree_eval.compile_model(model)
+    predictor = compiled if compiled is not None else model
+    predictor.predict(row)
+    timings = []
+    for _ in range(LATENCY_CALLS):
+        start = time.perf_counter()
+        predictor.predict(row)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1e6
+
+
+def _evaluate(task):
+    """Worker: нэг candidate-ийг нэг fold дээр үнэлэх"""
+    kind, params, fold, data_dir = task
+    X = np.load(os.path.join(data_dir, 'X.npy'), mmap_mode='r')
+    y = np.load(os.path.join(data_dir, 'y.npy'), mmap_mode='r')
+    classifier = kind != 'GradientBoostingRegressor'
+    train_idx, test_idx = _folds(y, classifier)[fold]
+
+    model = ESTIMATORS[kind](random_state=42, **params)
+    if classifier:
+        model.set_params(n_jobs=1)
+    start = time.perf_counter()
+    model.fit(X[train_idx], y[train_idx])
+    fit_seconds = time.perf_counter() - start
+
+    pred = model.predict(X[test_idx])
+    if classifier:
+        score = float(np.mean(pred == y[test_idx]))
+    else:
+        score = -float(np.sqrt(np.mean((pred - y[test_idx]) ** 2)))
+    latency = _single_row_latency_us(model, np.asarray(X[test_idx[:1]])) if fold == 0 else None
+    return fit_seconds, score, latency
+
+
+def search(name, kind, grid, X, y, workers=None, max_latency_us=None):
+    """
+    Grid-ийг process pool дээр cross-validate хийж, шилдгийг сургах
+
+    Returns:
+        (бүтэн өгөгдөл дээр сургасан шилдэг модель, metadata-д бичих тайлан)
+    """
+    workers = workers or os.cpu_count() or 1
+    keys = sorted(grid)
+    candidates = [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+    print(f"   Searching {len(candidates)} candidates x {CV_FOLDS} folds on {workers} workers...")
+
+    data_dir = tempfile.mkdtemp(prefix=f'eysh-tune-{name}-')
+    started = time.perf_counter()
+    try:
+        np.save(os.path.join(data_dir, 'X.npy'), np.ascontiguousarray(X, dtype=np.float64))
+        np.save(os.path.join(data_dir, 'y.npy'), np.asarray(y))
+        tasks = [(kind, params, fold, data_dir) for params in candidates for fold in range(CV_FOLDS)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            outcomes = list(pool.map(_evaluate, tasks))
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    results = []
+    for i, params in enumerate(candidates):
+        runs = outcomes[i * CV_FOLDS:(i + 1) * CV_FOLDS]
+        scores = [score for _, score, _ in runs]
+        results.append({
+            'params': params,
+            'cv_score': float(np.mean(scores)),
+            'cv_std': float(np.std(scores)),
+            'fit_seconds': float(np.mean([fit for fit, _, _ in runs])),
+            'latency_us': round(runs[0][2], 1),
+        })
+    results.sort(key=lambda r: r['cv_score'], reverse=True)
+
+    eligible = [r for r in results if max_latency_us is None or r['latency_us'] <= max_latency_us]
+    best = (eligible or results)[0]
+    model = ESTIMATORS[kind](random_state=42, **best['params'])
+    if kind != 'GradientBoostingRegressor':
+        model.set_params(n_jobs=-1)
+    model.fit(np.asarray(X), np.asarray(y))
+
+    report = {
+        'params': best['params'],
+        'cv_score': best['cv_score'],
+        'scoring': 'accuracy' if kind != 'GradientBoostingRegressor' else 'neg_rmse',
+        'latency_us': best['latency_us'],
+        'max_latency_us': max_latency_us,
+        'search_seconds': round(time.perf_counter() - started, 2),
+        'candidates': results,
+    }
+    print(f"   Best: {best['params']} cv={best['cv_score']:.4f} latency={best['latency_us']}us")
+    return model, report